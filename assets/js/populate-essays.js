@@ -1,3 +1,5 @@
+const PAGE_SIZE = 50;
+
 let sortLikesAscending = false;
 let sortDatesAscending = false;
 let showHTML = true;
@@ -19,6 +21,7 @@ function populateEssays(data) {
     const essaysContainer = document.getElementById('essays-container');
     const list = data.map(essay => `
         <li>
+            ${essay.thumbnail ? `<img class="thumbnail" src="../${essay.thumbnail}" alt="" loading="lazy">` : ''}
             <a href="../${showHTML ? essay.html_link : essay.file_link}" target="_blank">${essay.title}</a>
             <div class="subtitle">${essay.subtitle}</div>
             <div class="metadata">${essay.like_count} Likes - ${essay.date}</div>
@@ -27,17 +30,112 @@ function populateEssays(data) {
     essaysContainer.innerHTML = `<ul>${list}</ul>`;
 }
 
+// Sharded pages: essays live in script files loaded only for the page being shown.
+const loadedShards = {};
+const pendingShards = {};
+
+window.substackEssayShard = (number, essays) => {
+    loadedShards[number] = essays;
+    if (pendingShards[number]) {
+        pendingShards[number].resolve();
+    }
+};
+
+function loadShard(index, number) {
+    if (loadedShards[number]) {
+        return Promise.resolve();
+    }
+    if (!pendingShards[number]) {
+        let resolve, reject;
+        const promise = new Promise((res, rej) => { resolve = res; reject = rej; });
+        pendingShards[number] = { promise, resolve };
+        const script = document.createElement('script');
+        script.src = index.shards[number];
+        script.onerror = () => {
+            delete pendingShards[number];
+            reject(new Error(`Could not load ${index.shards[number]}`));
+        };
+        document.body.appendChild(script);
+    }
+    return pendingShards[number].promise;
+}
+
+function createShardedList(index) {
+    const state = { ordering: index.orderings.date, reversed: false, page: 0 };
+    const pageCount = Math.max(1, Math.ceil(index.count / PAGE_SIZE));
+
+    function pageIndexes() {
+        const order = state.reversed ? [...state.ordering].reverse() : state.ordering;
+        return order.slice(state.page * PAGE_SIZE, (state.page + 1) * PAGE_SIZE);
+    }
+
+    function renderPagination() {
+        const pagination = document.getElementById('pagination');
+        if (!pagination) {
+            return;
+        }
+        pagination.innerHTML = pageCount > 1 ? `
+            <button id="page-prev" ${state.page === 0 ? 'disabled' : ''}>Prev</button>
+            <span class="page-status">Page ${state.page + 1} of ${pageCount}</span>
+            <button id="page-next" ${state.page === pageCount - 1 ? 'disabled' : ''}>Next</button>
+        ` : '';
+        const prev = document.getElementById('page-prev');
+        const next = document.getElementById('page-next');
+        if (prev) prev.addEventListener('click', () => show(state.page - 1));
+        if (next) next.addEventListener('click', () => show(state.page + 1));
+    }
+
+    function show(page) {
+        state.page = Math.min(Math.max(page, 0), pageCount - 1);
+        const indexes = pageIndexes();
+        const shards = [...new Set(indexes.map(i => Math.floor(i / index.shard_size)))];
+        return Promise.all(shards.map(number => loadShard(index, number))).then(() => {
+            populateEssays(indexes.map(i => loadedShards[Math.floor(i / index.shard_size)][i % index.shard_size]));
+            renderPagination();
+        });
+    }
+
+    function sortBy(ordering) {
+        // Clicking the active sort again flips its direction, like the unsharded page.
+        state.reversed = state.ordering === ordering ? !state.reversed : false;
+        state.ordering = ordering;
+        return show(0);
+    }
+
+    return {
+        show,
+        refresh: () => show(state.page),
+        sortByDate: () => sortBy(index.orderings.date),
+        sortByLikes: () => sortBy(index.orderings.likes),
+    };
+}
+
 
 document.addEventListener('DOMContentLoaded', () => {
-    const embeddedDataElement = document.getElementById('essaysData');
-    let essaysData = JSON.parse(embeddedDataElement.textContent);
+    const indexElement = document.getElementById('essaysIndex');
+    let render, sortByDate, sortByLikes;
+
+    if (indexElement) {
+        const list = createShardedList(JSON.parse(indexElement.textContent));
+        render = list.refresh;
+        sortByDate = list.sortByDate;
+        sortByLikes = list.sortByLikes;
+    }
+    else {
+        // Pages generated before sharding embed every essay
+        const embeddedDataElement = document.getElementById('essaysData');
+        let essaysData = JSON.parse(embeddedDataElement.textContent);
+        render = () => populateEssays(essaysData);
+        sortByDate = () => populateEssays(sortEssaysByDate([...essaysData]));
+        sortByLikes = () => populateEssays(sortEssaysByLikes([...essaysData]));
+    }
 
     // Check if the toggle button exists to maintain backwards compatibility
     const toggleButton = document.getElementById('toggle-format');
     if (toggleButton) {
         toggleButton.addEventListener('click', () => {
             showHTML = !showHTML;
-            populateEssays(essaysData);
+            render();
             toggleButton.textContent = showHTML ? 'Show Markdown' : 'Show HTML';
         });
     }
@@ -45,13 +143,8 @@ document.addEventListener('DOMContentLoaded', () => {
         showHTML = false;  // Default to showing markdown as there won't be any html files in older versions
     }
 
-    document.getElementById('sort-by-date').addEventListener('click', () => {
-        populateEssays(sortEssaysByDate([...essaysData]));
-    });
-
-    document.getElementById('sort-by-likes').addEventListener('click', () => {
-        populateEssays(sortEssaysByLikes([...essaysData]));
-    });
+    document.getElementById('sort-by-date').addEventListener('click', sortByDate);
+    document.getElementById('sort-by-likes').addEventListener('click', sortByLikes);
 
-    populateEssays(essaysData);
+    render();
 });
@@ -0,0 +1,50 @@
+"""
+Compares the throughput of the installed HTML -> Markdown converters.
+
+Usage:
+    python benchmarks/converters.py [--corpus DIR] [--converter NAME ...] [--repeat N]
+
+Each ``*.html`` file in the corpus (default: benchmarks/corpus) is converted by
+every converter, and the fastest of ``--repeat`` passes is reported per file and
+for the whole corpus.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from substack_scraper import MARKDOWN_CONVERTERS, available_converters, benchmark_converters  # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark HTML to Markdown converters.")
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR, help="Directory of .html fixtures.")
+    parser.add_argument(
+        "--converter", action="append", choices=list(MARKDOWN_CONVERTERS),
+        help="Converter to benchmark; repeat for several (default: all installed)."
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Passes per measurement (default: 5).")
+    args = parser.parse_args()
+
+    files = sorted(args.corpus.glob("*.html"))
+    if not files:
+        sys.exit(f"No .html files in {args.corpus}")
+    documents = {path.name: path.read_text(encoding="utf-8") for path in files}
+    names = args.converter or available_converters()
+
+    print(f"{'document':<28}{'KB':>8}  " + "".join(f"{name:>16}" for name in names))
+    for filename, html in documents.items():
+        results = benchmark_converters([html], names, args.repeat)
+        row = "".join(f"{results[name]['docs_per_sec']:>12.1f} /s " for name in names)
+        print(f"{filename:<28}{len(html.encode('utf-8')) / 1000:>8.1f}  {row}")
+
+    results = benchmark_converters(list(documents.values()), names, args.repeat)
+    row = "".join(f"{results[name]['mb_per_sec']:>11.2f} MB/s" for name in names)
+    print(f"{'corpus':<28}{'':>8}  {row}")
+
+
+if __name__ == "__main__":
+    main()
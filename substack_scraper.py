@@ -3,22 +3,33 @@ import hashlib
 import json
 import mimetypes
 import os
-import random
+import queue
 import re
 import shutil
+import sqlite3
 import subprocess
 import sys
+import threading
 from abc import ABC, abstractmethod
+from collections import deque
+from itertools import islice
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from html import escape, unescape
+from http.cookiejar import Cookie, CookieJar, LoadError, MozillaCookieJar
 from pathlib import Path
-from urllib.parse import unquote, urlparse
-from typing import List, Optional, Tuple
-from time import sleep
+from urllib.parse import quote, unquote, urlparse
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from time import monotonic, sleep, time
 
 import html2text
 import markdown
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from tqdm import tqdm
 from xml.etree import ElementTree as ET
 
@@ -30,7 +41,9 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.edge.service import Service as EdgeService
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import SessionNotCreatedException, TimeoutException, WebDriverException
+from selenium.common.exceptions import (
+    SessionNotCreatedException, StaleElementReferenceException, TimeoutException, WebDriverException
+)
 
 from config import EMAIL, PASSWORD
 
@@ -42,6 +55,295 @@ BASE_IMAGE_DIR: str = "substack_images"
 HTML_TEMPLATE: str = "author_template.html"
 JSON_DATA_DIR: str = "data"
 NUM_POSTS_TO_SCRAPE: int = 0
+NUM_WORKERS: int = 1
+IMAGE_WORKERS: int = 4
+API_ARCHIVE_PAGE_SIZE: int = 50
+SITEMAP_NS: str = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+HTTP_POOL_SIZE: int = 10
+HTTP_TIMEOUT: float = 30.0
+RATE_LIMIT_INITIAL: float = 4.0
+RATE_LIMIT_MIN: float = 0.1
+RATE_LIMIT_MAX: float = 20.0
+WRITE_BUFFER_SIZE: int = 256 * 1024
+ESSAY_SHARD_SIZE: int = 200
+SUBSTACK_IMAGE_CDN: str = "https://substackcdn.com/image/fetch/"
+IMAGE_VARIANT_FORMATS: Tuple[str, ...] = ("webp", "jpg", "png", "auto")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header (delay in seconds or an HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_throttled_response(response: requests.Response) -> bool:
+    """Whether the server asked to slow down: HTTP 429, or 503 with a Retry-After header."""
+    return response.status_code == 429 or (
+        response.status_code == 503 and "Retry-After" in response.headers
+    )
+
+
+class TokenBucket:
+    """Token bucket for a single host whose refill rate adapts to throttling."""
+
+    def __init__(self, rate: float, min_rate: float, max_rate: float, increase: float):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.tokens = 1.0
+        self.updated = monotonic()
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.throttle_events = 0
+
+    def reserve(self, now: float) -> float:
+        """Takes a token if one is available, otherwise returns how long to wait."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self.tokens = min(1.0, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = max(self.updated, now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            self.requests += 1
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def on_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, now: float, retry_after: Optional[float]) -> None:
+        self.rate = max(self.min_rate, self.rate / 2)
+        pause = retry_after if retry_after is not None else 1.0 / self.rate
+        self.blocked_until = max(self.blocked_until, now + pause)
+        # Start refilling only once the pause is over.
+        self.tokens = 0.0
+        self.updated = self.blocked_until
+        self.throttle_events += 1
+
+
+class RateLimiter:
+    """Adaptive per-host rate limiter shared by every request a scraper makes.
+
+    Each host gets a token bucket. A throttle signal (HTTP 429 or Substack's
+    "too many requests" page) halves that host's rate and pauses it for the
+    ``Retry-After`` delay when one is given; every successful request then adds
+    ``increase`` requests/second back, up to ``max_rate``.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_INITIAL,
+        min_rate: float = RATE_LIMIT_MIN,
+        max_rate: float = RATE_LIMIT_MAX,
+        increase: float = 0.05,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.max_rate = max(max_rate, rate)
+        self.increase = increase
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(
+                self.rate, self.min_rate, self.max_rate, self.increase
+            )
+        return bucket
+
+    def acquire(self, url: str) -> None:
+        """Blocks until a request to ``url``'s host is allowed."""
+        while True:
+            with self._lock:
+                wait = self._bucket(url).reserve(monotonic())
+            if wait <= 0:
+                return
+            sleep(wait)
+
+    def record_success(self, url: str) -> None:
+        with self._lock:
+            self._bucket(url).on_success()
+
+    def record_throttle(self, url: str, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self._bucket(url).on_throttle(monotonic(), retry_after)
+
+    def current_rate(self, url: str) -> float:
+        with self._lock:
+            return self._bucket(url).rate
+
+    @property
+    def throttle_events(self) -> int:
+        with self._lock:
+            return sum(bucket.throttle_events for bucket in self._buckets.values())
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Returns ``{host: {"rate", "requests", "throttle_events"}}`` for every host seen."""
+        with self._lock:
+            return {
+                host: {
+                    "rate": round(bucket.rate, 3),
+                    "requests": bucket.requests,
+                    "throttle_events": bucket.throttle_events,
+                }
+                for host, bucket in self._buckets.items()
+            }
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests that don't set one."""
+
+    def __init__(self, *args, timeout: float = HTTP_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class RateLimitedHTTPAdapter(TimeoutHTTPAdapter):
+    """TimeoutHTTPAdapter that paces requests through a shared RateLimiter."""
+
+    def __init__(self, *args, rate_limiter: RateLimiter, **kwargs):
+        self.rate_limiter = rate_limiter
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        self.rate_limiter.acquire(request.url)
+        response = super().send(request, **kwargs)
+        if is_throttled_response(response):
+            self.rate_limiter.record_throttle(
+                request.url, parse_retry_after(response.headers.get("Retry-After"))
+            )
+        elif response.status_code < 500:
+            # A failing server is no reason to speed up.
+            self.rate_limiter.record_success(request.url)
+        return response
+
+
+def create_http_session(
+    pool_connections: int = HTTP_POOL_SIZE,
+    pool_maxsize: int = HTTP_POOL_SIZE,
+    timeout: float = HTTP_TIMEOUT,
+    user_agent: Optional[str] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> requests.Session:
+    """Creates a keep-alive session shared by every request a scraper makes.
+
+    Args:
+        pool_connections: Number of hosts to keep connection pools for.
+        pool_maxsize: Maximum open connections per host; extra requests wait for a free one.
+        timeout: Default timeout in seconds for requests that don't pass their own.
+        user_agent: Optional User-Agent header.
+        rate_limiter: Limiter pacing every request; a new one is created if omitted.
+            It is also exposed as ``session.rate_limiter``.
+    """
+    session = requests.Session()
+    session.rate_limiter = rate_limiter or RateLimiter()
+    adapter = RateLimitedHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=True,
+        timeout=timeout,
+        rate_limiter=session.rate_limiter,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    return session
+
+
+def http_get(url: str, session: Optional[requests.Session] = None, **kwargs) -> requests.Response:
+    """GETs ``url`` through ``session``, or as a one-off request with the default timeout."""
+    if session is None:
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        return requests.get(url, **kwargs)
+    return session.get(url, **kwargs)
+
+
+@contextmanager
+def atomic_open(
+    path: Union[str, Path], mode: str = 'w', buffer_size: int = WRITE_BUFFER_SIZE, **kwargs
+):
+    """Opens a temporary file next to ``path`` that replaces ``path`` only once fully written.
+
+    An interrupted write leaves the previous file (or none) in place, never a truncated one.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, mode, buffering=buffer_size, **kwargs) as file:
+            yield file
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def file_sha256(path: Union[str, Path], buffer_size: int = WRITE_BUFFER_SIZE) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(buffer_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ArchiveEntry(NamedTuple):
+    """A post listed by the publication archive, with its ISO publish/update times."""
+    url: str
+    published: str
+    updated: str
+
+
+PAYWALL_TITLE_PATTERN = re.compile(r'<h2\b[^>]*\bclass="[^"]*\bpaywall-title\b')
+# The paywall block that follows a truncated ``div.available-content`` preview.
+PAYWALL_BLOCK_PATTERN = re.compile(
+    r'<div\b[^>]*\b(?:class="(?:[^"]*\s)?paywall[\s"]|data-component-name="Paywall)'
+)
+
+
+def is_paywalled_html(html: str) -> bool:
+    """Cheap check for Substack's paywall header (``h2.paywall-title``) without parsing the page."""
+    return PAYWALL_TITLE_PATTERN.search(html) is not None
+
+
+def is_truncated_html(html: str) -> bool:
+    """Whether a post page shows only a preview: a paywall header, or the paywall block after the content."""
+    return is_paywalled_html(html) or PAYWALL_BLOCK_PATTERN.search(html) is not None
+
+
+def is_rate_limited_html(html: str) -> bool:
+    """Detects Substack's plain "too many requests" page (text in ``body > pre``)."""
+    if "too many requests" not in html.lower():
+        return False
+    pre = BeautifulSoup(html, "html.parser").select_one("body > pre")
+    return pre is not None and "too many requests" in pre.text.lower()
+
+
+def decode_html(response: requests.Response) -> str:
+    """Decodes a page body, assuming UTF-8 unless the server declares a charset."""
+    content_type = response.headers.get("content-type", "")
+    encoding = response.encoding if "charset" in content_type.lower() else "utf-8"
+    return response.content.decode(encoding or "utf-8", errors="replace")
 
 
 def resolve_image_url(url: str) -> str:
@@ -53,6 +355,42 @@ def resolve_image_url(url: str) -> str:
     return url
 
 
+class ImagePolicy(NamedTuple):
+    """Which Substack CDN variant of an image to download: ``0``/``""`` leave that aspect as-is.
+
+    ``format`` is one of :data:`IMAGE_VARIANT_FORMATS`; ``quality`` is 1-100.
+    """
+    max_width: int = 0
+    format: str = ""
+    quality: int = 0
+
+    @property
+    def active(self) -> bool:
+        return bool(self.max_width or self.format or self.quality)
+
+    def variant_url(self, url: str) -> Optional[str]:
+        """Returns the CDN URL serving ``url`` (an original image URL) under this policy, if any."""
+        if not self.active:
+            return None
+        options = []
+        if self.max_width:
+            options += [f"w_{self.max_width}", "c_limit"]
+        if self.format:
+            options.append(f"f_{self.format}")
+        if self.quality:
+            options.append(f"q_{self.quality}")
+        return f"{SUBSTACK_IMAGE_CDN}{','.join(options)}/{quote(url, safe='')}"
+
+    @property
+    def extension(self) -> Optional[str]:
+        """The extension of the policy's fixed output format; ``None`` when the CDN picks it."""
+        return None if self.format in ("", "auto") else f".{self.format}"
+
+    def filename(self, filename: str) -> str:
+        """Gives ``filename`` the policy's output extension, if it has one."""
+        return f"{os.path.splitext(filename)[0]}{self.extension}" if self.extension else filename
+
+
 def clean_linked_images(md_content: str) -> str:
     """Converts markdown linked images [![alt](img)](link) to ![alt](img)."""
     pattern = r'\[!\[(.*?)\]\((.*?)\)\]\(.*?\)'
@@ -84,33 +422,197 @@ def get_post_slug(url: str) -> str:
     return match.group(1) if match else 'unknown_post'
 
 
-def sanitize_image_filename(url: str) -> str:
-    """Create a safe filename from an image URL."""
-    url = resolve_image_url(url)
+# Image file extension per resolved image URL, learned from downloads.
+IMAGE_EXTENSION_CACHE: Dict[str, str] = {}
+
+IMAGE_SIGNATURES: List[Tuple[bytes, str]] = [
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+    (b"BM", ".bmp"),
+    (b"II*\x00", ".tif"),
+    (b"MM\x00*", ".tif"),
+]
+
+# Substack CDN fetch options that fix the output format, e.g. ``f_png``.
+CDN_FORMAT_PATTERN = re.compile(r'^https://substackcdn\.com/image/fetch/(?:[^/]*,)?f_(png|jpg|jpeg|gif|webp)(?:,|/)')
+
+
+def sniff_image_extension(head: bytes, content_type: str = "") -> Optional[str]:
+    """Identifies an image's extension from its first bytes, falling back to its content-type."""
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:12] in (b"ftypavif", b"ftypavis"):
+        return ".avif"
+    if head.lstrip()[:5] in (b"<svg ", b"<?xml"):
+        return ".svg"
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type.startswith("image/"):
+        ext = mimetypes.guess_extension(content_type)
+        return ".jpg" if ext in (".jpe", ".jpeg") else ext
+    return None
+
+
+def guess_image_extension(url: str) -> Optional[str]:
+    """Returns an image's extension without a request: from an earlier download, then URL hints."""
+    resolved = resolve_image_url(url)
+    ext = IMAGE_EXTENSION_CACHE.get(resolved)
+    if ext:
+        return ext
+    match = CDN_FORMAT_PATTERN.match(url)
+    if match:
+        return ".jpg" if match.group(1) == "jpeg" else f".{match.group(1)}"
+    content_type, _ = mimetypes.guess_type(urlparse(resolved).path)
+    return sniff_image_extension(b"", content_type or "")
+
+
+def _image_url_filename(url: str) -> str:
     filename = url.split("/")[-1]
     filename = filename.split("?")[0]
-    filename = re.sub(r'[<>:"/\\|?*]', '', filename)
+    return re.sub(r'[<>:"/\\|?*]', '', filename)
+
+
+def needs_image_extension(url: str) -> bool:
+    """True when an image URL has no usable filename, so its name is a hash plus a detected extension."""
+    filename = _image_url_filename(resolve_image_url(url))
+    return len(filename) > 100 or not filename
+
+
+def sanitize_image_filename(url: str, policy: Optional[ImagePolicy] = None) -> str:
+    """Create a safe filename from an image URL.
+
+    URLs without a usable filename get a hash name, with the extension from
+    :func:`guess_image_extension` (``.jpg`` if nothing is known yet). A
+    ``policy`` with a fixed output format sets the extension instead.
+    """
+    url_hint = url
+    url = resolve_image_url(url)
+    filename = _image_url_filename(url)
 
     if len(filename) > 100 or not filename:
         hash_object = hashlib.md5(url.encode())
-        ext = mimetypes.guess_extension(
-            requests.head(url).headers.get('content-type', '')
-        ) or '.jpg'
+        ext = guess_image_extension(url_hint) or '.jpg'
         filename = f"{hash_object.hexdigest()}{ext}"
 
-    return filename
+    return policy.filename(filename) if policy else filename
+
+
+def fetch_image(
+    url: str,
+    save_path: Path,
+    pbar=None,
+    session: Optional[requests.Session] = None,
+    policy: Optional[ImagePolicy] = None,
+    buffer_size: int = WRITE_BUFFER_SIZE,
+) -> Optional[str]:
+    """Downloads the ``policy``'s CDN variant of the original image at ``url``, falling back to the original."""
+    if fetch_image_source(url, save_path, pbar, session, policy, buffer_size) is None:
+        return None
+    return str(save_path)
+
+
+def fetch_image_source(
+    url: str,
+    save_path: Path,
+    pbar=None,
+    session: Optional[requests.Session] = None,
+    policy: Optional[ImagePolicy] = None,
+    buffer_size: int = WRITE_BUFFER_SIZE,
+) -> Optional[str]:
+    """Like :func:`fetch_image`, but returns the URL the image came from: the variant's, or ``url`` on fallback."""
+    variant_url = policy.variant_url(url) if policy else None
+    if variant_url:
+        if download_image(variant_url, save_path, pbar, session, buffer_size) is not None:
+            if variant_url in IMAGE_EXTENSION_CACHE:
+                IMAGE_EXTENSION_CACHE.setdefault(url, IMAGE_EXTENSION_CACHE[variant_url])
+            return variant_url
+        # Don't resume the original from the variant's partial bytes.
+        partial_path(save_path).unlink(missing_ok=True)
+    if download_image(url, save_path, pbar, session, buffer_size) is None:
+        return None
+    return url
+
+
+def partial_path(save_path: Path) -> Path:
+    """Where :func:`download_image` keeps an unfinished download of ``save_path``."""
+    return save_path.with_name(save_path.name + ".part")
+
+
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes\s+(?:(\d+)-\d+|\*)/(\d+|\*)$')
+
+
+def parse_content_range(value: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Parses a Content-Range header into (first byte, complete length); parts not given are None."""
+    match = CONTENT_RANGE_PATTERN.match((value or "").strip())
+    if not match:
+        return None, None
+    start, total = match.groups()
+    return (int(start) if start else None), (None if total == "*" else int(total))
+
 
+def download_image(
+    url: str,
+    save_path: Path,
+    pbar=None,
+    session: Optional[requests.Session] = None,
+    buffer_size: int = WRITE_BUFFER_SIZE,
+) -> Optional[str]:
+    """Download image from URL and save to path.
 
-def download_image(url: str, save_path: Path, pbar=None) -> Optional[str]:
-    """Download image from URL and save to path."""
+    Bytes go to ``<save_path>.part``, which is renamed to ``save_path`` only
+    once the body is complete. A ``.part`` left by an interrupted download is
+    resumed with an HTTP Range request; servers that ignore the range resend
+    the whole image. A part that doesn't match the server's idea of the image
+    (an unexpected range, or a size other than the image's) is discarded and
+    the image downloaded again from the start.
+    """
+    part_path = partial_path(save_path)
     try:
-        response = requests.get(url, stream=True)
-        if response.status_code == 200:
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        response = http_get(url, session, stream=True, headers=headers)
+        if response.status_code == 416 and offset:
+            # The range starts at or past the end: the part holds the whole image if it is exactly that long.
+            _, total = parse_content_range(response.headers.get("content-range"))
+            response.close()
+            if total == offset:
+                os.replace(part_path, save_path)
+                if pbar:
+                    pbar.update(1)
+                return str(save_path)
+            part_path.unlink()
+            return download_image(url, save_path, pbar, session, buffer_size)
+        if response.status_code in (200, 206):
             save_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
+            start = 0
+            if response.status_code == 206:
+                start, _ = parse_content_range(response.headers.get("content-range"))
+            if start not in (0, offset):
+                # Not the bytes following the part's, nor the whole image: start over without the part.
+                response.close()
+                part_path.unlink(missing_ok=True)
+                if not offset:
+                    raise IOError(f"unexpected range {response.headers.get('content-range')!r}")
+                return download_image(url, save_path, pbar, session, buffer_size)
+            offset = start
+            expected = response.headers.get("content-length")
+            with open(part_path, 'ab' if offset else 'wb', buffering=buffer_size) as f:
+                for chunk in response.iter_content(chunk_size=buffer_size):
                     if chunk:
+                        if f.tell() == 0:
+                            ext = sniff_image_extension(chunk, response.headers.get("content-type", ""))
+                            if ext:
+                                IMAGE_EXTENSION_CACHE[url] = ext
                         f.write(chunk)
+                written = f.tell() - offset
+            # Content-Length counts encoded bytes, so only check it for unencoded bodies.
+            if expected and not response.headers.get("content-encoding") and written != int(expected):
+                raise IOError(f"incomplete download ({written} of {expected} bytes); will resume")
+            os.replace(part_path, save_path)
             if pbar:
                 pbar.update(1)
             return str(save_path)
@@ -123,19 +625,177 @@ def download_image(url: str, save_path: Path, pbar=None) -> Optional[str]:
     return None
 
 
-def process_markdown_images(md_content: str, author: str, post_slug: str, pbar=None) -> str:
-    """Process markdown content to download images and update references."""
+class ImageDownloadQueue:
+    """
+    Downloads images on a pool of worker threads shared by every post in a run.
+
+    Posts enqueue their images and move on; each local path is downloaded at
+    most once, however many posts reference it. With an :class:`ImageStore`,
+    images are fetched into the store and linked into place, and URLs the
+    store has already seen are linked without a download. With an
+    :class:`ImageTranscoder`, each download is then resized and recompressed,
+    and :meth:`output_path` gives the file references should point to.
+    :meth:`close` waits until the queue is empty.
+    """
+
+    def __init__(
+        self,
+        workers: int = IMAGE_WORKERS,
+        session: Optional[requests.Session] = None,
+        store: Optional["ImageStore"] = None,
+        policy: Optional[ImagePolicy] = None,
+        transcoder: Optional["ImageTranscoder"] = None,
+        buffer_size: int = WRITE_BUFFER_SIZE,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.session = session
+        self.store = store
+        self.policy = policy
+        self.transcoder = transcoder
+        self.buffer_size = buffer_size
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image")
+        self.pbar = tqdm(total=0, desc="Downloading images", unit="img", position=1, leave=False)
+        self.lock = threading.Lock()
+        self.queued: set = set()
+        self.futures: List[Future] = []
+        self.downloaded = 0
+        self.failed = 0
+
+    def submit(self, url: str, save_path: Path) -> None:
+        """Queues ``url`` for download to ``save_path`` unless it is saved or already queued."""
+        with self.lock:
+            if save_path in self.queued or (
+                save_path.exists() and (self.transcoder is None or self.transcoder.is_done(save_path))
+            ):
+                return
+            self.queued.add(save_path)
+        if self.store is not None and self.transcoder is None:
+            blob = self.store.lookup(url, self.policy)
+            if blob is not None:
+                self.store.link(blob, save_path, self.store.buffer_size)
+                return
+        with self.lock:
+            self.pbar.total += 1
+            self.pbar.refresh()
+            self.futures.append(self.pool.submit(self._download, url, save_path))
+
+    def _download(self, url: str, save_path: Path) -> None:
+        if self.store is not None:
+            result = self.store.materialize(url, save_path, self.session, self.policy)
+        else:
+            result = fetch_image(
+                url, save_path, session=self.session, policy=self.policy, buffer_size=self.buffer_size
+            )
+        if result is not None and self.transcoder is not None:
+            self.transcoder.optimize(save_path)
+        with self.lock:
+            if result is None:
+                self.failed += 1
+            else:
+                self.downloaded += 1
+            self.pbar.update(1)
+
+    def output_path(self, save_path: Path) -> Path:
+        """The file that references to the image downloaded to ``save_path`` should use."""
+        if self.transcoder is not None and self.transcoder.settings.applies_to(save_path):
+            return self.transcoder.settings.optimized_path(save_path)
+        return save_path
+
+    def thumbnail_path(self, save_path: Path) -> Optional[Path]:
+        if self.transcoder is not None and self.transcoder.settings.applies_to(save_path):
+            return self.transcoder.settings.thumbnail_path(save_path)
+        return None
+
+    def close(self) -> None:
+        """Waits for every queued download to finish, then shuts the workers down."""
+        self.pool.shutdown(wait=True)
+        if self.transcoder is not None:
+            self.transcoder.close()
+        self.pbar.close()
+        if self.store is not None:
+            self.store.save()
+        if self.futures:
+            fetched = f", {self.store.fetched} fetched" if self.store is not None else ""
+            print(f"Saved {self.downloaded} images{fetched} ({self.failed} failed)")
+
+    def __enter__(self) -> "ImageDownloadQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def localize_image(
+    url: str,
+    author: str,
+    post_slug: str,
+    pbar=None,
+    session: Optional[requests.Session] = None,
+    queue: Optional[ImageDownloadQueue] = None,
+    policy: Optional[ImagePolicy] = None,
+) -> Path:
+    """Returns the local path for a Substack CDN image, downloading it unless already saved.
+
+    With a ``queue``, the download is handed to it (under the queue's image
+    policy) and this returns immediately, unless the file name depends on an
+    image type nothing is known about yet; then the image is downloaded first
+    and named from the response.
+    """
+    buffer_size = WRITE_BUFFER_SIZE
+    if queue is not None:
+        policy = queue.policy
+        buffer_size = queue.buffer_size
+    resolved_url = resolve_image_url(url)
     image_dir = Path(BASE_IMAGE_DIR) / author / post_slug
+    fixed_format = policy is not None and policy.extension is not None
+    if needs_image_extension(url) and not fixed_format and guess_image_extension(url) is None:
+        name_hash = hashlib.md5(resolved_url.encode()).hexdigest()
+        # The extension cache is per run; a copy saved by an earlier run tells the type too.
+        saved = next(
+            (path for path in image_dir.glob(f"{name_hash}.*") if path.suffix not in (".download", ".part")),
+            None,
+        )
+        if saved is not None:
+            IMAGE_EXTENSION_CACHE.setdefault(resolved_url, saved.suffix)
+        elif queue is not None and queue.store is not None:
+            queue.store.fetch(resolved_url, session, policy)
+        else:
+            part_path = image_dir / f"{name_hash}.download"
+            downloaded = fetch_image(resolved_url, part_path, pbar, session, policy, buffer_size) is not None
+            save_path = image_dir / sanitize_image_filename(url, policy)
+            if downloaded:
+                os.replace(part_path, save_path)
+            return save_path
+
+    save_path = image_dir / sanitize_image_filename(url, policy)
+    if queue is not None:
+        queue.submit(resolved_url, save_path)
+    elif not save_path.exists():
+        fetch_image(resolved_url, save_path, pbar, session, policy)
+    return save_path
+
+
+def process_markdown_images(
+    md_content: str,
+    author: str,
+    post_slug: str,
+    pbar=None,
+    session: Optional[requests.Session] = None,
+    queue: Optional[ImageDownloadQueue] = None,
+    policy: Optional[ImagePolicy] = None,
+) -> str:
+    """Process markdown content to download images and update references.
+
+    With a ``queue``, references are rewritten right away and downloads happen in the background.
+    """
     md_content = clean_linked_images(md_content)
 
     def replace_image(match):
         url = match.group(0).strip('()')
-        resolved_url = resolve_image_url(url)
-        filename = sanitize_image_filename(url)
-        save_path = image_dir / filename
-        if not save_path.exists():
-            download_image(resolved_url, save_path, pbar)
-
+        save_path = localize_image(url, author, post_slug, pbar, session, queue, policy)
+        if queue is not None:
+            save_path = queue.output_path(save_path)
         rel_path = os.path.relpath(save_path, Path(BASE_MD_DIR) / author)
         return f"({rel_path})"
 
@@ -143,13 +803,91 @@ def process_markdown_images(md_content: str, author: str, post_slug: str, pbar=N
     return re.sub(pattern, replace_image, md_content)
 
 
+def process_html_images(
+    html_content: str,
+    author: str,
+    post_slug: str,
+    html_dir: str,
+    pbar=None,
+    session: Optional[requests.Session] = None,
+    queue: Optional[ImageDownloadQueue] = None,
+    policy: Optional[ImagePolicy] = None,
+) -> str:
+    """Points ``<img src>`` at local copies of Substack CDN images, relative to ``html_dir``."""
+    def replace_image(match):
+        save_path = localize_image(
+            unescape(match.group(1)), author, post_slug, pbar, session, queue, policy
+        )
+        if queue is not None:
+            save_path = queue.output_path(save_path)
+        rel_path = os.path.relpath(save_path, html_dir).replace("\\", "/")
+        return f'src="{escape(rel_path)}"'
+
+    pattern = r'src="(https://substackcdn\.com/image/fetch/[^"]+)"'
+    return re.sub(pattern, replace_image, html_content)
+
+
 def extract_main_part(url: str) -> str:
     parts = urlparse(url).netloc.split('.')
     return parts[1] if parts[0] == 'www' else parts[0]
 
 
+def essay_orderings(essays_data: List[dict]) -> Dict[str, List[int]]:
+    """Precomputes newest-first and most-liked-first orderings as lists of essay indexes.
+
+    Undated essays sort last by date; ties keep catalog order.
+    """
+    def date_key(i: int) -> Tuple[bool, str]:
+        date = essays_data[i].get("date") or ""
+        return bool(re.match(r"\d{4}-\d{2}-\d{2}", date)), date
+
+    def likes_key(i: int) -> int:
+        likes = str(essays_data[i].get("like_count") or "0")
+        return int(likes) if likes.isdigit() else 0
+
+    indexes = range(len(essays_data))
+    return {
+        "date": sorted(indexes, key=date_key, reverse=True),
+        "likes": sorted(indexes, key=likes_key, reverse=True),
+    }
+
+
+def write_essay_shards(author_name: str, essays_data: List[dict], shard_size: int = 0) -> dict:
+    """Writes the essays as compact JS shard files next to the author page and returns their index.
+
+    Shards are scripts calling ``substackEssayShard(n, essays)`` rather than
+    JSON files, so the page can load them on demand from ``file://`` too.
+    """
+    shard_size = shard_size or ESSAY_SHARD_SIZE
+    shard_dir = Path(BASE_HTML_DIR) / author_name / "_index"
+    if shard_dir.exists():
+        for stale in shard_dir.glob("essays-*.js"):
+            stale.unlink()
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    shards = []
+    for number, start in enumerate(range(0, len(essays_data), shard_size)):
+        path = shard_dir / f"essays-{number:04d}.js"
+        rows = json.dumps(essays_data[start:start + shard_size], ensure_ascii=False, separators=(",", ":"))
+        with atomic_open(path, 'w', encoding='utf-8') as file:
+            file.write(f"substackEssayShard({number},{rows});\n")
+        shards.append(path.relative_to(BASE_HTML_DIR).as_posix())
+    return {
+        "version": 2,
+        "count": len(essays_data),
+        "shard_size": shard_size,
+        "shards": shards,
+        "orderings": essay_orderings(essays_data),
+    }
+
+
 def generate_html_file(author_name: str) -> None:
-    """Generates a HTML file for the given author."""
+    """Generates a HTML file for the given author.
+
+    The page embeds only a small index; essays are written to shard files
+    it loads a page at a time. Templates without the ``essaysIndex``
+    placeholder get all essays embedded, as before.
+    """
     if not os.path.exists(BASE_HTML_DIR):
         os.makedirs(BASE_HTML_DIR)
 
@@ -157,22 +895,687 @@ def generate_html_file(author_name: str) -> None:
     with open(json_path, 'r', encoding='utf-8') as file:
         essays_data = json.load(file)
 
-    embedded_json_data = json.dumps(essays_data, ensure_ascii=False, indent=4)
-
     with open(HTML_TEMPLATE, 'r', encoding='utf-8') as file:
         html_template = file.read()
 
-    html_with_data = html_template.replace('<!-- AUTHOR_NAME -->', author_name).replace(
-        '<script type="application/json" id="essaysData"></script>',
-        f'<script type="application/json" id="essaysData">{embedded_json_data}</script>'
-    )
+    index_placeholder = '<script type="application/json" id="essaysIndex"></script>'
+    if index_placeholder in html_template:
+        index = write_essay_shards(author_name, essays_data)
+        html_with_data = html_template.replace(
+            index_placeholder,
+            f'<script type="application/json" id="essaysIndex">{json.dumps(index, separators=(",", ":"))}</script>'
+        )
+    else:
+        embedded_json_data = json.dumps(essays_data, ensure_ascii=False, separators=(",", ":"))
+        html_with_data = html_template.replace(
+            '<script type="application/json" id="essaysData"></script>',
+            f'<script type="application/json" id="essaysData">{embedded_json_data}</script>'
+        )
+    html_with_data = html_with_data.replace('<!-- AUTHOR_NAME -->', author_name)
     html_with_author = html_with_data.replace('author_name', author_name)
 
     html_output_path = os.path.join(BASE_HTML_DIR, f'{author_name}.html')
-    with open(html_output_path, 'w', encoding='utf-8') as file:
+    with atomic_open(html_output_path, 'w', encoding='utf-8') as file:
         file.write(html_with_author)
 
 
+# =============================================================================
+# SYNC MANIFEST
+# =============================================================================
+
+class SyncManifest:
+    """
+    Per-publication record of what has been scraped, stored as
+    ``data/<author>.sync.json``: post URL -> lastmod, content hash and output paths.
+
+    Lets incremental runs decide what to fetch without touching the output files.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)
+
+    @classmethod
+    def for_author(cls, author_name: str) -> "SyncManifest":
+        return cls(os.path.join(JSON_DATA_DIR, f'{author_name}.sync.json'))
+
+    def needs_fetch(self, url: str, lastmod: Optional[str]) -> bool:
+        """True for posts never synced, or whose lastmod moved since the last sync."""
+        entry = self.entries.get(url)
+        if entry is None:
+            return True
+        return bool(lastmod) and lastmod != entry.get("lastmod")
+
+    def content_hash(self, url: str) -> Optional[str]:
+        entry = self.entries.get(url)
+        return entry.get("content_hash") if entry else None
+
+    def record(self, url: str, lastmod: Optional[str], content_hash: str, md_path: str, html_path: str) -> None:
+        self.entries[url] = {
+            "lastmod": lastmod or "",
+            "content_hash": content_hash,
+            "md_path": md_path,
+            "html_path": html_path,
+        }
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with atomic_open(self.path, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, ensure_ascii=False)
+
+
+# =============================================================================
+# POST CATALOG
+# =============================================================================
+
+class PostCatalog:
+    """
+    SQLite catalog of scraped posts for every publication, keyed by post URL.
+
+    Re-scraped posts are upserted in place, so the catalog never holds
+    duplicates. :meth:`export_json` writes the ``data/<author>.json`` list that
+    :func:`generate_html_file` reads.
+    """
+
+    # Essay fields in the JSON export, in order; ``thumbnail`` is exported only when set.
+    FIELDS: Tuple[str, ...] = (
+        "title", "subtitle", "author", "date", "cover_image", "like_count", "file_link", "html_link", "thumbnail",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS posts (
+                    url TEXT PRIMARY KEY,
+                    publication TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    subtitle TEXT NOT NULL DEFAULT '',
+                    author TEXT NOT NULL DEFAULT '',
+                    date TEXT NOT NULL DEFAULT '',
+                    cover_image TEXT NOT NULL DEFAULT '',
+                    like_count INTEGER NOT NULL DEFAULT 0,
+                    file_link TEXT NOT NULL,
+                    html_link TEXT NOT NULL DEFAULT '',
+                    thumbnail TEXT
+                );
+                CREATE INDEX IF NOT EXISTS posts_by_date ON posts (publication, date);
+                CREATE INDEX IF NOT EXISTS posts_by_likes ON posts (publication, like_count);
+                CREATE INDEX IF NOT EXISTS posts_by_file ON posts (file_link);
+            """)
+
+    @classmethod
+    def open_default(cls) -> "PostCatalog":
+        return cls(os.path.join(JSON_DATA_DIR, "catalog.sqlite3"))
+
+    def __enter__(self) -> "PostCatalog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def upsert(self, publication: str, essays: Iterable[dict]) -> None:
+        """Inserts or updates essays (dicts with ``url`` plus :attr:`FIELDS`) in one transaction.
+
+        Rows imported from legacy JSON have no URL; they are replaced by the
+        first scraped row with the same ``file_link``.
+        """
+        with self.connection:
+            for essay in essays:
+                like_count = str(essay.get("like_count") or "0")
+                row = (
+                    essay["url"], publication, essay.get("title", ""), essay.get("subtitle", ""),
+                    essay.get("author", ""), essay.get("date", ""), essay.get("cover_image", ""),
+                    int(like_count) if like_count.isdigit() else 0,
+                    essay.get("file_link", ""), essay.get("html_link", ""), essay.get("thumbnail"),
+                )
+                self.connection.execute(
+                    "DELETE FROM posts WHERE file_link = ? AND url != ? AND url LIKE 'legacy:%'",
+                    (row[8], row[0]),
+                )
+                self.connection.execute("""
+                    INSERT INTO posts (url, publication, title, subtitle, author, date, cover_image,
+                                       like_count, file_link, html_link, thumbnail)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (url) DO UPDATE SET
+                        publication = excluded.publication, title = excluded.title,
+                        subtitle = excluded.subtitle, author = excluded.author, date = excluded.date,
+                        cover_image = excluded.cover_image, like_count = excluded.like_count,
+                        file_link = excluded.file_link, html_link = excluded.html_link,
+                        thumbnail = COALESCE(excluded.thumbnail, posts.thumbnail)
+                """, row)
+
+    def import_legacy_json(self, publication: str, json_path: str) -> int:
+        """Imports ``data/<author>.json`` from before the catalog existed, once per publication."""
+        if not os.path.exists(json_path) or self.count(publication):
+            return 0
+        with open(json_path, 'r', encoding='utf-8') as file:
+            essays = json.load(file)
+        # The old merge kept every changed version of a post; the last one written wins.
+        latest = {essay.get("file_link", ""): essay for essay in essays}
+        self.upsert(publication, (
+            dict(essay, url=f"legacy:{file_link}") for file_link, essay in latest.items()
+        ))
+        return len(latest)
+
+    def count(self, publication: str) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM posts WHERE publication = ?", (publication,)
+        ).fetchone()[0]
+
+    def posts(
+        self, publication: str, order_by: Optional[str] = None, descending: bool = True, limit: int = 0
+    ) -> List[dict]:
+        """Returns a publication's essays as export dicts.
+
+        ``order_by`` is ``"date"`` or ``"likes"`` (served by the indexes);
+        by default posts come in the order they were first catalogued.
+        """
+        columns = {"date": "date", "likes": "like_count", None: "rowid"}
+        if order_by not in columns:
+            raise ValueError("order_by must be 'date', 'likes' or None")
+        direction = "DESC" if descending and order_by else "ASC"
+        query = f"SELECT * FROM posts WHERE publication = ? ORDER BY {columns[order_by]} {direction}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        essays = []
+        for row in self.connection.execute(query, (publication,)):
+            essay = {field: row[field] for field in self.FIELDS if field != "thumbnail"}
+            essay["like_count"] = str(row["like_count"])
+            if row["thumbnail"]:
+                essay["thumbnail"] = row["thumbnail"]
+            essays.append(essay)
+        return essays
+
+    def export_json(self, publication: str, json_path: str) -> None:
+        """Writes the publication's essays to ``json_path`` in the shape :func:`generate_html_file` expects."""
+        with atomic_open(json_path, 'w', encoding='utf-8') as file:
+            json.dump(self.posts(publication), file, ensure_ascii=False, indent=4)
+
+
+# =============================================================================
+# SEARCH INDEX
+# =============================================================================
+
+MARKDOWN_TITLE_PATTERN = re.compile(r'^(?:# (.+)|title: "(.*)")$', re.MULTILINE)
+
+
+class SearchHit(NamedTuple):
+    url: str
+    publication: str
+    title: str
+    date: str
+    file_link: str
+    snippet: str
+    score: float
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 full-text index over scraped posts, stored at ``data/search.sqlite3``.
+
+    Titles, subtitles, authors and Markdown bodies are indexed with Porter
+    stemming; :meth:`search` ranks hits with BM25, weighting titles highest.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.connection = sqlite3.connect(path)
+        try:
+            with self.connection:
+                self.connection.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                        url UNINDEXED, publication UNINDEXED, date UNINDEXED, file_link UNINDEXED,
+                        title, subtitle, author, body,
+                        tokenize = 'porter unicode61'
+                    )
+                """)
+        except sqlite3.OperationalError:
+            # e.g. "no such module: fts5" where SQLite was built without FTS5.
+            self.connection.close()
+            raise
+
+    @classmethod
+    def open_default(cls) -> "SearchIndex":
+        return cls(os.path.join(JSON_DATA_DIR, "search.sqlite3"))
+
+    def __enter__(self) -> "SearchIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.commit()
+        self.connection.close()
+
+    def add(
+        self,
+        url: str,
+        publication: str,
+        title: str,
+        subtitle: str,
+        author: str,
+        date: str,
+        file_link: str,
+        body: str,
+    ) -> None:
+        """Indexes a post, replacing any earlier version. Committed on :meth:`commit` or :meth:`close`."""
+        self.connection.execute("DELETE FROM posts_fts WHERE url = ?", (url,))
+        self.connection.execute(
+            "INSERT INTO posts_fts (url, publication, date, file_link, title, subtitle, author, body) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, publication, date, file_link, title, subtitle, author, body),
+        )
+
+    def commit(self) -> None:
+        self.connection.commit()
+
+    def clear(self, publication: Optional[str] = None) -> None:
+        with self.connection:
+            if publication is None:
+                self.connection.execute("DELETE FROM posts_fts")
+            else:
+                self.connection.execute("DELETE FROM posts_fts WHERE publication = ?", (publication,))
+
+    def rebuild(self, md_dir: str = BASE_MD_DIR, catalog: Optional[PostCatalog] = None) -> int:
+        """Re-indexes every Markdown file under ``md_dir/<author>/``; returns the number indexed.
+
+        Metadata comes from the catalog where it knows the file, otherwise from
+        the file's title line.
+        """
+        known: Dict[str, dict] = {}
+        if catalog is not None:
+            for row in catalog.connection.execute("SELECT * FROM posts"):
+                known[os.path.normpath(row["file_link"])] = dict(row)
+        self.clear()
+        count = 0
+        for md_path in sorted(Path(md_dir).glob("*/*.md")):
+            body = md_path.read_text(encoding="utf-8")
+            file_link = str(md_path)
+            entry = known.get(os.path.normpath(file_link))
+            if entry is None:
+                match = MARKDOWN_TITLE_PATTERN.search(body)
+                title = (match.group(1) or match.group(2)) if match else md_path.stem
+                entry = {
+                    "url": f"file:{md_path.as_posix()}", "publication": md_path.parent.name, "title": title,
+                    "subtitle": "", "author": "", "date": "",
+                }
+            self.add(
+                entry["url"], entry["publication"], entry["title"], entry["subtitle"], entry["author"],
+                entry["date"], file_link, body,
+            )
+            count += 1
+        self.commit()
+        return count
+
+    def search(self, query: str, publication: Optional[str] = None, limit: int = 10) -> List[SearchHit]:
+        """Returns the best ``limit`` hits for an FTS5 query, best first.
+
+        Queries that aren't valid FTS5 syntax are retried as a plain list of terms.
+        """
+        sql = """
+            SELECT url, publication, title, date, file_link,
+                   snippet(posts_fts, 7, '[', ']', '...', 12),
+                   bm25(posts_fts, 0, 0, 0, 0, 10.0, 4.0, 2.0, 1.0) AS score
+            FROM posts_fts
+            WHERE posts_fts MATCH ? {where}
+            ORDER BY score
+            LIMIT ?
+        """.format(where="AND publication = ?" if publication else "")
+
+        def run(match: str) -> List[SearchHit]:
+            params = [match] + ([publication] if publication else []) + [limit]
+            return [SearchHit(*row) for row in self.connection.execute(sql, params)]
+
+        try:
+            return run(query)
+        except sqlite3.OperationalError:
+            terms = re.findall(r'\w+', query)
+            return run(" ".join(f'"{term}"' for term in terms)) if terms else []
+
+
+def search_main(argv: List[str]) -> None:
+    """Entry point for ``substack_scraper.py search ...`` and ``substack_scraper.py reindex ...``."""
+    parser = argparse.ArgumentParser(prog="substack_scraper.py", description="Search scraped posts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search_parser = commands.add_parser("search", help="Full-text search across scraped posts.")
+    search_parser.add_argument("query", nargs="+", help="Words to find; FTS5 syntax (AND, OR, \"phrases\", prefix*) works too.")
+    search_parser.add_argument("--author", help="Only search this publication (e.g. 'example' for example.substack.com).")
+    search_parser.add_argument("-n", "--limit", type=int, default=10, help="Maximum hits to show (default: 10).")
+    reindex_parser = commands.add_parser("reindex", help="Rebuild the search index from the scraped Markdown files.")
+    reindex_parser.add_argument(
+        "-d", "--directory", default=BASE_MD_DIR, help=f"Markdown directory (default: {BASE_MD_DIR})."
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "reindex":
+        started = monotonic()
+        with SearchIndex.open_default() as index, PostCatalog.open_default() as catalog:
+            count = index.rebuild(args.directory, catalog)
+        print(f"Indexed {count} posts in {monotonic() - started:.1f}s")
+        return
+
+    started = monotonic()
+    with SearchIndex.open_default() as index:
+        hits = index.search(" ".join(args.query), args.author, args.limit)
+    elapsed_ms = (monotonic() - started) * 1000
+    for rank, hit in enumerate(hits, 1):
+        print(f"{rank}. {hit.title} ({hit.publication}, {hit.date or 'no date'})")
+        print(f"   {hit.file_link}")
+        print(f"   {' '.join(hit.snippet.split())}")
+    print(f"{len(hits)} hits in {elapsed_ms:.0f} ms")
+
+
+# =============================================================================
+# IMAGE STORE
+# =============================================================================
+
+class ImageStore:
+    """
+    Content-addressed image blobs shared by every post and publication.
+
+    Blobs live at ``<root>/<sha256[:2]>/<sha256>``, and ``<root>/index.json``
+    maps each resolved image URL (or, under an :class:`ImagePolicy`, the CDN
+    variant URL) to its hash, so a URL seen in any earlier
+    post or run is never fetched again. Per-post image paths are hard links
+    to the blobs (symlinks, or copies, where links aren't supported), so the
+    same bytes are stored once.
+    """
+
+    def __init__(self, root: Union[str, Path], buffer_size: int = WRITE_BUFFER_SIZE):
+        self.root = Path(root)
+        self.buffer_size = buffer_size
+        self.index_path = self.root / "index.json"
+        self.index: Dict[str, str] = {}
+        if self.index_path.exists():
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                self.index = json.load(file)
+        self.lock = threading.Lock()
+        self.url_locks: Dict[str, threading.Lock] = {}
+        self.fetched = 0
+
+    @classmethod
+    def default(cls, buffer_size: int = WRITE_BUFFER_SIZE) -> "ImageStore":
+        return cls(Path(BASE_IMAGE_DIR) / "_store", buffer_size)
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    @staticmethod
+    def key(url: str, policy: Optional[ImagePolicy] = None) -> str:
+        return (policy.variant_url(url) if policy else None) or url
+
+    def lookup(self, url: str, policy: Optional[ImagePolicy] = None) -> Optional[Path]:
+        """Returns the blob already stored for ``url`` under ``policy``, if any."""
+        with self.lock:
+            digest = self.index.get(self.key(url, policy))
+        if digest is None:
+            return None
+        blob = self.blob_path(digest)
+        return blob if blob.exists() else None
+
+    def fetch(
+        self, url: str, session: Optional[requests.Session] = None, policy: Optional[ImagePolicy] = None
+    ) -> Optional[Path]:
+        """Returns the blob for ``url``, downloading it only if the URL hasn't been stored before."""
+        key = self.key(url, policy)
+        with self.lock:
+            url_lock = self.url_locks.setdefault(key, threading.Lock())
+        # Posts queued together often share an image; only the first of them downloads it.
+        with url_lock:
+            blob = self.lookup(url, policy)
+            if blob is not None:
+                if url not in IMAGE_EXTENSION_CACHE:
+                    with open(blob, 'rb') as file:
+                        ext = sniff_image_extension(file.read(32))
+                    if ext:
+                        IMAGE_EXTENSION_CACHE[url] = ext
+                return blob
+            tmp_dir = self.root / "tmp"
+            tmp_dir.mkdir(parents=True, exist_ok=True)
+            # Named by URL, so a download interrupted in an earlier run resumes from its .part file.
+            tmp_path = tmp_dir / hashlib.sha1(key.encode()).hexdigest()
+            try:
+                source = fetch_image_source(
+                    url, tmp_path, session=session, policy=policy, buffer_size=self.buffer_size
+                )
+                if source is None:
+                    return None
+                digest = file_sha256(tmp_path, self.buffer_size)
+                blob = self.blob_path(digest)
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                if blob.exists():
+                    # Same bytes under another URL.
+                    tmp_path.unlink()
+                else:
+                    os.replace(tmp_path, blob)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+            with self.lock:
+                # The original fetched when the variant failed isn't the variant; a later run tries it again.
+                self.index[source] = digest
+                self.fetched += 1
+            return blob
+
+    @staticmethod
+    def link(blob: Path, save_path: Path, buffer_size: int = WRITE_BUFFER_SIZE) -> None:
+        """Makes ``save_path`` a hard link to ``blob``, falling back to a symlink, then a copy."""
+        save_path.parent.mkdir(parents=True, exist_ok=True)
+        if save_path.exists() or save_path.is_symlink():
+            save_path.unlink()
+        try:
+            os.link(blob, save_path)
+        except OSError:
+            try:
+                os.symlink(os.path.relpath(blob, save_path.parent), save_path)
+            except OSError:
+                with open(blob, 'rb') as source, atomic_open(save_path, 'wb', buffer_size) as target:
+                    shutil.copyfileobj(source, target, buffer_size)
+
+    def materialize(
+        self,
+        url: str,
+        save_path: Path,
+        session: Optional[requests.Session] = None,
+        policy: Optional[ImagePolicy] = None,
+    ) -> Optional[str]:
+        """Links ``save_path`` to the image at ``url``, fetching it if needed. Returns None on failure."""
+        blob = self.fetch(url, session, policy)
+        if blob is None:
+            return None
+        self.link(blob, save_path, self.buffer_size)
+        return str(save_path)
+
+    def verify(self, session: Optional[requests.Session] = None, image_root: Optional[Path] = None) -> Tuple[int, int]:
+        """Rehashes every blob and re-fetches those that are truncated, corrupt or missing.
+
+        Per-post files under ``image_root`` that linked to a bad blob are
+        relinked to the re-fetched one (or removed, if it can't be fetched).
+        Returns ``(blobs checked, URLs re-fetched)``.
+        """
+        bad_inodes: Dict[int, str] = {}
+        checked = 0
+        for blob in self.root.glob("??/*"):
+            if len(blob.name) != 64:
+                continue
+            checked += 1
+            if file_sha256(blob, self.buffer_size) != blob.name:
+                bad_inodes[blob.stat().st_ino] = blob.name
+                blob.unlink()
+
+        with self.lock:
+            stale = {url: digest for url, digest in self.index.items() if not self.blob_path(digest).exists()}
+            for url in stale:
+                del self.index[url]
+        replacements: Dict[str, Path] = {}
+        for url, digest in stale.items():
+            blob = self.fetch(url, session)
+            if blob is not None:
+                replacements.setdefault(digest, blob)
+
+        bad_digests = set(bad_inodes.values()) | set(stale.values())
+        if image_root is not None and bad_digests:
+            for path in Path(image_root).rglob("*"):
+                if self.root in path.parents or path == self.root:
+                    continue
+                if path.is_symlink():
+                    digest = Path(os.readlink(path)).name
+                elif path.is_file():
+                    digest = bad_inodes.get(path.stat().st_ino)
+                else:
+                    continue
+                if digest not in bad_digests:
+                    continue
+                if digest in replacements:
+                    self.link(replacements[digest], path, self.buffer_size)
+                else:
+                    path.unlink()
+        self.save()
+        return checked, len(replacements)
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self.lock, atomic_open(self.index_path, 'w', encoding='utf-8') as file:
+            json.dump(self.index, file)
+
+
+# =============================================================================
+# IMAGE TRANSCODING
+# =============================================================================
+
+# Formats transcoding leaves alone: vector images, and GIFs, which are often animated.
+UNTRANSCODED_EXTENSIONS = {".svg", ".gif"}
+
+
+class ImageTranscode(NamedTuple):
+    """Settings for locally resized, recompressed copies and thumbnails of downloaded images."""
+    max_width: int = 1600
+    thumbnail_width: int = 320
+    format: str = "webp"
+    quality: int = 80
+
+    @property
+    def key(self) -> str:
+        return f"{self.max_width}w-{self.thumbnail_width}t-q{self.quality}.{self.format}"
+
+    def applies_to(self, save_path: Path) -> bool:
+        return save_path.suffix.lower() not in UNTRANSCODED_EXTENSIONS
+
+    def optimized_path(self, save_path: Path) -> Path:
+        return save_path.with_name(f"{save_path.stem}-{self.max_width}w.{self.format}")
+
+    def thumbnail_path(self, save_path: Path) -> Path:
+        return save_path.with_name(f"{save_path.stem}-thumb.{self.format}")
+
+
+def transcode_image(source: str, derived_dir: str, settings: ImageTranscode) -> Tuple[str, str]:
+    """Writes the optimized copy and thumbnail of the image at ``source`` and returns their paths.
+
+    Outputs are named by the source's content hash and the settings, so an
+    image already transcoded (under any URL, post or run) is not redone.
+    Runs in a worker process; needs Pillow.
+    """
+    with open(source, 'rb') as file:
+        data = file.read()
+    digest = hashlib.sha256(data).hexdigest()
+    directory = Path(derived_dir) / digest[:2]
+    optimized = directory / f"{digest}-{settings.key}"
+    thumbnail = directory / f"{digest}-thumb-{settings.key}"
+    if optimized.exists() and thumbnail.exists():
+        return str(optimized), str(thumbnail)
+
+    from io import BytesIO
+    from PIL import Image, ImageOps
+
+    directory.mkdir(parents=True, exist_ok=True)
+    with Image.open(BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if settings.format in ("jpg", "jpeg") and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA")
+        pil_format = "JPEG" if settings.format in ("jpg", "jpeg") else settings.format.upper()
+        for path, width in ((optimized, settings.max_width), (thumbnail, settings.thumbnail_width)):
+            resized = image.copy()
+            resized.thumbnail((width, width * 100), Image.LANCZOS)
+            # Write under a temporary name so concurrent workers never see a partial file.
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            resized.save(tmp_path, pil_format, quality=settings.quality)
+            os.replace(tmp_path, path)
+    return str(optimized), str(thumbnail)
+
+
+class ImageTranscoder:
+    """
+    Runs :func:`transcode_image` on a process pool and links the results next
+    to each downloaded image (see :meth:`ImageTranscode.optimized_path` and
+    :meth:`ImageTranscode.thumbnail_path`).
+    """
+
+    def __init__(
+        self,
+        settings: ImageTranscode = ImageTranscode(),
+        processes: Optional[int] = None,
+        derived_dir: Union[str, Path, None] = None,
+    ):
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            raise ImportError("Image optimization needs Pillow: pip install pillow") from None
+        self.settings = settings
+        self.derived_dir = Path(derived_dir or Path(BASE_IMAGE_DIR) / "_store" / "derived")
+        self.pool = ProcessPoolExecutor(max_workers=processes)
+        self.failed = 0
+
+    def is_done(self, save_path: Path) -> bool:
+        return not self.settings.applies_to(save_path) or (
+            self.settings.optimized_path(save_path).exists() and self.settings.thumbnail_path(save_path).exists()
+        )
+
+    def optimize(self, save_path: Path) -> bool:
+        """Transcodes the downloaded image at ``save_path``, blocking until done.
+
+        If transcoding fails, the original is linked in place of both outputs so
+        references to them still resolve.
+        """
+        if not self.settings.applies_to(save_path):
+            return True
+        succeeded = True
+        try:
+            optimized, thumbnail = self.pool.submit(
+                transcode_image, str(save_path), str(self.derived_dir), self.settings
+            ).result()
+        except Exception as e:
+            print(f"Error optimizing image {save_path}: {e}")
+            self.failed += 1
+            succeeded = False
+            optimized = thumbnail = save_path
+        ImageStore.link(Path(optimized), self.settings.optimized_path(save_path))
+        ImageStore.link(Path(thumbnail), self.settings.thumbnail_path(save_path))
+        return succeeded
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+
+
 # =============================================================================
 # BROWSER/DRIVER UTILITIES
 # =============================================================================
@@ -188,6 +1591,16 @@ class BrowserManager:
     
     SUPPORTED_BROWSERS = ['chrome', 'edge']
     CACHE_DIR = os.path.join(os.path.expanduser('~'), '.substack_scraper', 'drivers')
+    # Requests lean page loads block (images are turned off through prefs): web fonts,
+    # audio/video, analytics and third-party embeds. Post text is in the served HTML.
+    LEAN_BLOCKED_URLS = [
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+        "*.mp3", "*.m4a", "*.mp4", "*.webm", "*.m3u8",
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*facebook.net*", "*connect.facebook.com*", "*segment.io*", "*segment.com*",
+        "*youtube.com/embed*", "*youtube-nocookie.com*", "*player.vimeo.com*",
+        "*platform.twitter.com*", "*open.spotify.com/embed*", "*embed.podcasts.apple.com*",
+    ]
     
     @classmethod
     def get_cache_dir(cls) -> str:
@@ -323,7 +1736,9 @@ class BrowserManager:
         return os.path.join(base_dir, f'{browser}_profile')
     
     @classmethod
-    def download_driver_with_requests(cls, browser: str, browser_version: str) -> Optional[str]:
+    def download_driver_with_requests(
+        cls, browser: str, browser_version: str, session: Optional[requests.Session] = None
+    ) -> Optional[str]:
         """
         Download the correct driver directly using requests.
         This bypasses webdriver_manager issues and gives us full control.
@@ -362,7 +1777,7 @@ class BrowserManager:
                 
                 # Try LATEST_RELEASE endpoint first
                 try:
-                    resp = requests.get(endpoints[0], timeout=30)
+                    resp = http_get(endpoints[0], session, timeout=30)
                     if resp.ok:
                         driver_version = resp.text.strip()
                         # Construct download URL
@@ -373,7 +1788,7 @@ class BrowserManager:
                 
                 # Fallback to JSON endpoint
                 if not download_url:
-                    resp = requests.get(endpoints[1], timeout=30)
+                    resp = http_get(endpoints[1], session, timeout=30)
                     if resp.ok:
                         data = resp.json()
                         channels = data.get('channels', {})
@@ -393,7 +1808,7 @@ class BrowserManager:
                     return None
                 
                 print(f"Downloading chromedriver {driver_version}...")
-                resp = requests.get(download_url, timeout=120)
+                resp = http_get(download_url, session, timeout=120)
                 if not resp.ok:
                     print(f"Download failed: HTTP {resp.status_code}")
                     return None
@@ -447,7 +1862,7 @@ class BrowserManager:
                 # Try to get the exact version
                 version_url = f"https://msedgedriver.azureedge.net/LATEST_RELEASE_{major_version}"
                 try:
-                    resp = requests.get(version_url, timeout=30)
+                    resp = http_get(version_url, session, timeout=30)
                     if resp.ok:
                         driver_version = resp.text.strip()
                     else:
@@ -458,7 +1873,7 @@ class BrowserManager:
                 download_url = f"https://msedgedriver.azureedge.net/{driver_version}/edgedriver_{platform}.zip"
                 
                 print(f"Downloading msedgedriver {driver_version}...")
-                resp = requests.get(download_url, timeout=120)
+                resp = http_get(download_url, session, timeout=120)
                 if not resp.ok:
                     print(f"Download failed: HTTP {resp.status_code}")
                     return None
@@ -490,6 +1905,25 @@ class BrowserManager:
         
         return None
 
+    @staticmethod
+    def apply_lean_options(options: Union[ChromeOptions, EdgeOptions]) -> None:
+        """Returns from page loads at DOMContentLoaded and turns off images and notifications."""
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+
+    @classmethod
+    def block_lean_requests(cls, driver: webdriver.Remote) -> None:
+        """Blocks :attr:`LEAN_BLOCKED_URLS` through the DevTools protocol; browsers without it load everything."""
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": cls.LEAN_BLOCKED_URLS})
+        except (AttributeError, WebDriverException) as e:
+            print(f"WARNING: Could not block fonts, media and trackers: {e}")
+
     @classmethod
     def create_driver(
         cls,
@@ -499,14 +1933,40 @@ class BrowserManager:
         browser_path: Optional[str] = None,
         user_agent: Optional[str] = None,
         use_persistent_profile: bool = False,
+        session: Optional[requests.Session] = None,
+        lean: bool = False,
     ) -> webdriver.Remote:
         """
-        Creates a WebDriver instance with smart fallback logic.
-        
-        Strategy:
-        1. Use explicit driver path if provided
-        2. Check our local cache for a compatible driver
-        3. Download driver directly to our cache (bypasses PATH issues)
+        Creates a WebDriver instance, set up for lean page loads when ``lean`` is set.
+
+        See :meth:`launch_driver` for how the driver is found.
+        """
+        driver = cls.launch_driver(
+            browser, headless, driver_path, browser_path, user_agent, use_persistent_profile, session, lean
+        )
+        if lean:
+            cls.block_lean_requests(driver)
+        return driver
+
+    @classmethod
+    def launch_driver(
+        cls,
+        browser: str = 'chrome',
+        headless: bool = False,
+        driver_path: Optional[str] = None,
+        browser_path: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        use_persistent_profile: bool = False,
+        session: Optional[requests.Session] = None,
+        lean: bool = False,
+    ) -> webdriver.Remote:
+        """
+        Starts a WebDriver instance with smart fallback logic.
+        
+        Strategy:
+        1. Use explicit driver path if provided
+        2. Check our local cache for a compatible driver
+        3. Download driver directly to our cache (bypasses PATH issues)
         4. Fall back to webdriver_manager
         5. Fall back to Selenium Manager
         """
@@ -555,6 +2015,9 @@ class BrowserManager:
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-gpu")
         options.add_argument("--window-size=1920,1080")
+
+        if lean:
+            cls.apply_lean_options(options)
         
         errors = []
         
@@ -582,7 +2045,7 @@ class BrowserManager:
         if browser_version:
             print(f"\nDownloading driver to local cache (bypasses system PATH)...")
             try:
-                downloaded_path = cls.download_driver_with_requests(browser, browser_version)
+                downloaded_path = cls.download_driver_with_requests(browser, browser_version, session)
                 if downloaded_path and os.path.exists(downloaded_path):
                     print(f"Using downloaded driver: {downloaded_path}")
                     if browser == 'chrome':
@@ -723,6 +2186,599 @@ class BrowserManager:
         return "\n".join(lines)
 
 
+class DriverPool:
+    """Browser instances shared by fetch threads, each loading one page at a time.
+
+    Drivers beyond ``first`` are started on demand by ``factory``, opened on
+    ``seed_url`` and given ``cookies()`` so they share the first driver's login.
+    A driver that dies while in use is quit and replaced on the next acquire.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], webdriver.Remote],
+        size: int,
+        seed_url: str,
+        cookies: Callable[[], List[dict]],
+        first: Optional[webdriver.Remote] = None,
+    ):
+        self.factory = factory
+        self.size = max(1, size)
+        self.seed_url = seed_url
+        self.cookies = cookies
+        self.idle: "queue.Queue[webdriver.Remote]" = queue.Queue()
+        self.drivers: List[webdriver.Remote] = []
+        self.lock = threading.Lock()
+        self.restarts = 0
+        if first is not None:
+            self.drivers.append(first)
+            self.idle.put(first)
+
+    def start_driver(self) -> webdriver.Remote:
+        driver = self.factory()
+        driver.get(self.seed_url)
+        for cookie in self.cookies():
+            try:
+                driver.add_cookie(cookie)
+            except WebDriverException:
+                pass  # Cookie for another domain than the seed page
+        return driver
+
+    def take(self) -> webdriver.Remote:
+        """Returns an idle driver, starting one if the pool isn't full, else waiting for one."""
+        while True:
+            try:
+                return self.idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self.lock:
+                if len(self.drivers) < self.size:
+                    # Reserve the slot so concurrent callers don't overshoot the pool size.
+                    self.drivers.append(None)
+                    break
+            try:
+                # Wake up now and then: a discarded driver frees a slot without returning to the queue.
+                return self.idle.get(timeout=1)
+            except queue.Empty:
+                continue
+        try:
+            driver = self.start_driver()
+        except BaseException:
+            with self.lock:
+                self.drivers.remove(None)
+            raise
+        with self.lock:
+            self.drivers[self.drivers.index(None)] = driver
+        return driver
+
+    @staticmethod
+    def is_alive(driver: webdriver.Remote) -> bool:
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def discard(self, driver: webdriver.Remote) -> None:
+        """Quits a dead driver and frees its slot for a replacement."""
+        with self.lock:
+            self.drivers.remove(driver)
+            self.restarts += 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def acquire(self):
+        """Lends out a driver; on a WebDriver error, a driver that no longer responds is replaced."""
+        driver = self.take()
+        try:
+            yield driver
+        except WebDriverException:
+            if not self.is_alive(driver):
+                self.discard(driver)
+                driver = None
+            raise
+        finally:
+            if driver is not None:
+                self.idle.put(driver)
+
+    def close(self) -> None:
+        with self.lock:
+            drivers, self.drivers = [d for d in self.drivers if d is not None], []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+# =============================================================================
+# SESSION COOKIES
+# =============================================================================
+
+SESSION_COOKIE_JAR: str = os.path.join(os.path.expanduser('~'), '.substack_scraper', 'cookies.txt')
+# Cookies that carry a Substack login.
+LOGIN_COOKIE_NAMES: Tuple[str, ...] = ("substack.sid", "connect.sid")
+SIGN_IN_URL: str = "https://substack.com/sign-in"
+# Seconds to wait for the sign-in form to render, and for a submitted login to be accepted or refused.
+LOGIN_FORM_TIMEOUT: float = 15.0
+LOGIN_TIMEOUT: float = 30.0
+
+
+def cookie_from_driver(cookie: dict) -> Cookie:
+    """Converts a cookie from ``driver.get_cookies()`` into one ``requests`` and cookie jars accept."""
+    return requests.cookies.create_cookie(
+        name=cookie["name"],
+        value=cookie["value"],
+        domain=cookie.get("domain", ""),
+        path=cookie.get("path", "/"),
+        secure=cookie.get("secure", False),
+        expires=cookie.get("expiry"),
+        rest={"HttpOnly": None} if cookie.get("httpOnly") else {},
+    )
+
+
+def cookie_to_driver(cookie: Cookie) -> dict:
+    """Converts a cookie jar cookie into the dict ``driver.add_cookie()`` takes."""
+    driver_cookie = {
+        "name": cookie.name,
+        "value": cookie.value,
+        "domain": cookie.domain,
+        "path": cookie.path,
+        "secure": cookie.secure,
+        "httpOnly": cookie.has_nonstandard_attr("HttpOnly"),
+    }
+    if cookie.expires is not None:
+        driver_cookie["expiry"] = int(cookie.expires)
+    return driver_cookie
+
+
+def load_cookie_jar(path: str) -> MozillaCookieJar:
+    """Loads a saved cookie jar, dropping expired cookies; a missing or unreadable file gives an empty jar."""
+    jar = MozillaCookieJar(path)
+    if os.path.exists(path):
+        try:
+            jar.load(ignore_discard=True)
+        except (OSError, LoadError) as e:
+            print(f"Ignoring unreadable cookie jar {path}: {e}")
+    return jar
+
+
+def save_cookie_jar(jar: MozillaCookieJar) -> None:
+    """Saves a cookie jar readable only by the current user, since it holds login sessions.
+
+    The jar is written to a private temporary file that then replaces the old
+    one, so the file is never readable by others, even briefly, nor left half written.
+    """
+    path = os.path.abspath(jar.filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        # A stale temporary file keeps its old mode through O_CREAT.
+        os.fchmod(fd, 0o600)
+    finally:
+        os.close(fd)
+    try:
+        jar.save(tmp_path, ignore_discard=True)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def has_login_cookie(jar: CookieJar) -> bool:
+    """Whether ``jar`` holds an unexpired Substack login cookie."""
+    now = time()
+    return any(cookie.name in LOGIN_COOKIE_NAMES and not cookie.is_expired(now) for cookie in jar)
+
+
+# =============================================================================
+# MARKDOWN CONVERSION
+# =============================================================================
+
+DEFAULT_CONVERTER: str = "html2text"
+
+# HTML -> Markdown backends by name; see register_converter.
+MARKDOWN_CONVERTERS: Dict[str, type] = {}
+
+# Converter instances live per thread (and so per worker process), created on first use.
+_converter_state = threading.local()
+
+
+def register_converter(name: str) -> Callable[[type], type]:
+    """Class decorator registering an HTML -> Markdown backend under ``name``."""
+    def decorator(cls: type) -> type:
+        MARKDOWN_CONVERTERS[name] = cls
+        return cls
+    return decorator
+
+
+class MarkdownConverter(ABC):
+    """An HTML -> Markdown backend. Instances are reused for every post a worker converts."""
+
+    @abstractmethod
+    def convert(self, html_content: str) -> str:
+        """Converts an HTML fragment or page to Markdown."""
+        raise NotImplementedError
+
+
+@register_converter("html2text")
+class Html2TextConverter(MarkdownConverter):
+    """The default backend, using html2text with links kept and no line wrapping."""
+
+    def convert(self, html_content: str) -> str:
+        # HTML2Text carries output state across handle() calls, so a parser
+        # can't be reused; constructing one is cheap next to the conversion.
+        h = html2text.HTML2Text()
+        h.ignore_links = False
+        h.body_width = 0
+        return h.handle(html_content)
+
+
+@register_converter("markdownify")
+class MarkdownifyConverter(MarkdownConverter):
+    """Converts with markdownify (``pip install markdownify``), when installed."""
+
+    def __init__(self):
+        from markdownify import MarkdownConverter as Markdownify
+        self.converter = Markdownify(heading_style="ATX")
+
+    def convert(self, html_content: str) -> str:
+        return self.converter.convert(html_content)
+
+
+def available_converters() -> List[str]:
+    """Returns the registered converters whose dependencies are installed."""
+    names = []
+    for name in MARKDOWN_CONVERTERS:
+        try:
+            get_converter(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_converter(name: str = DEFAULT_CONVERTER) -> MarkdownConverter:
+    """Returns this thread's instance of the named converter, creating it on first use.
+
+    Raises ValueError for an unknown name and ImportError if the backend's
+    package isn't installed.
+    """
+    if name not in MARKDOWN_CONVERTERS:
+        raise ValueError(f"Unknown converter {name!r}; choose from {', '.join(MARKDOWN_CONVERTERS)}")
+    converters = getattr(_converter_state, "converters", None)
+    if converters is None:
+        converters = _converter_state.converters = {}
+    converter = converters.get(name)
+    if converter is None:
+        converter = converters[name] = MARKDOWN_CONVERTERS[name]()
+    return converter
+
+
+def get_markdown_renderer() -> markdown.Markdown:
+    """Returns this thread's Markdown -> HTML renderer, so extensions are loaded once per worker."""
+    renderer = getattr(_converter_state, "renderer", None)
+    if renderer is None:
+        renderer = _converter_state.renderer = markdown.Markdown(extensions=['extra'])
+    return renderer
+
+
+def benchmark_converters(
+    documents: List[str], names: Optional[List[str]] = None, repeat: int = 3
+) -> Dict[str, Dict[str, float]]:
+    """Times each converter over ``documents`` and reports its best throughput.
+
+    Returns ``{name: {"docs_per_sec": ..., "mb_per_sec": ...}}`` for every
+    requested (default: every installed) converter, taking the fastest of
+    ``repeat`` passes.
+    """
+    total_bytes = sum(len(doc.encode("utf-8")) for doc in documents)
+    results: Dict[str, Dict[str, float]] = {}
+    for name in names or available_converters():
+        converter = get_converter(name)
+        converter.convert(documents[0] if documents else "")  # warm up
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            start = monotonic()
+            for doc in documents:
+                converter.convert(doc)
+            best = min(best, monotonic() - start)
+        best = max(best, 1e-9)
+        results[name] = {
+            "docs_per_sec": len(documents) / best,
+            "mb_per_sec": total_bytes / best / 1_000_000,
+        }
+    return results
+
+
+# =============================================================================
+# POST EXTRACTION
+# =============================================================================
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER: str = "lxml"
+except ImportError:
+    HTML_PARSER: str = "html.parser"
+
+# Classes marking the parts of a post page extraction reads, per tag name.
+POST_PART_CLASSES: Dict[str, set] = {
+    "h1": {"post-title"},
+    "h3": {"subtitle"},
+    "div": {"subtitle-HEEcLo", "like-button-container", "available-content"},
+}
+
+
+def _tag_classes(attrs) -> List[str]:
+    classes = attrs.get("class") or ""
+    return classes.split() if isinstance(classes, str) else list(classes)
+
+
+def is_post_part(name: str, attrs) -> bool:
+    """Whether a tag is one extraction reads: ld+json, title, subtitle, likes, body or paywall."""
+    if name == "script":
+        return attrs.get("type") == "application/ld+json"
+    if name == "h2":
+        return True
+    wanted = POST_PART_CLASSES.get(name)
+    return bool(wanted) and any(cls in wanted for cls in _tag_classes(attrs))
+
+
+class PostPartsStrainer(SoupStrainer):
+    """Restricts parsing to post parts, skipping the navigation, footer and comment markup."""
+
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return is_post_part(name, attrs or {})
+
+
+# Tag-creation filtering needs beautifulsoup4 >= 4.13; older versions parse the whole page.
+POST_PARTS_STRAINER: Optional[SoupStrainer] = (
+    PostPartsStrainer() if hasattr(SoupStrainer, "allow_tag_creation") else None
+)
+
+
+def parse_post_html(html: str) -> BeautifulSoup:
+    """Parses only the parts of a post page that extraction needs, with the fastest parser installed."""
+    return BeautifulSoup(html, HTML_PARSER, parse_only=POST_PARTS_STRAINER)
+
+
+def find_post_parts(soup: BeautifulSoup) -> Dict[str, Tag]:
+    """Finds the first of each post part in a single document-order walk.
+
+    Returns a dict with any of ``ld_json``, ``title``, ``subtitle``, ``likes``,
+    ``content`` and ``paywall``. Matched parts are not descended into, so the
+    walk never visits the post body.
+    """
+    parts: Dict[str, Tag] = {}
+    stack = [soup]
+    while stack:
+        node = stack.pop()
+        if node is not soup and is_post_part(node.name, node.attrs):
+            classes = _tag_classes(node.attrs)
+            if node.name == "script":
+                key = "ld_json"
+            elif node.name == "h1" or node.name == "h2":
+                key = "title"
+                if "paywall-title" in classes:
+                    parts.setdefault("paywall", node)
+            elif node.name == "h3" or "subtitle-HEEcLo" in classes:
+                key = "subtitle"
+            elif "like-button-container" in classes:
+                key = "likes"
+            else:
+                key = "content"
+            parts.setdefault(key, node)
+            continue
+        stack.extend(child for child in reversed(node.contents) if isinstance(child, Tag))
+    return parts
+
+
+def clean_post_content(content: Tag) -> Tag:
+    """Prepares a post body for output, in place, and returns it.
+
+    Unwraps links around images (as :func:`clean_linked_images` does for
+    Markdown), reduces ``<picture>`` to its ``<img>``, drops responsive-image
+    attributes that would keep loading CDN variants, and removes Substack's
+    image toolbar, buttons and scripts.
+    """
+    for tag in content.select("div.image-link-expand, button, script"):
+        tag.decompose()
+    # Unwrapped, not removed: lxml nests the following <img> inside an unclosed <source>.
+    for source in content.select("picture source"):
+        source.unwrap()
+    for picture in content.find_all("picture"):
+        picture.unwrap()
+    for link in content.find_all("a"):
+        if link.find("img") is not None and not link.get_text(strip=True):
+            link.unwrap()
+    for img in content.find_all("img"):
+        for attr in ("srcset", "sizes", "data-attrs"):
+            img.attrs.pop(attr, None)
+    return content
+
+
+class ExtractedPost(NamedTuple):
+    """A post's metadata and content, as produced by :class:`PostExtractor`.
+
+    ``md_content`` and ``html_content`` are both built from the same cleaned body.
+    """
+    title: str
+    subtitle: str
+    author: str
+    date: str
+    cover_image: str
+    like_count: str
+    md_content: str
+    content_present: bool
+    html_content: Optional[str] = None
+
+
+class PostExtractor:
+    """
+    Turns a fetched post (page HTML, parsed soup, or API JSON) into an ExtractedPost.
+
+    Holds no network or browser state, so it can be pickled and run in a process pool.
+    """
+
+    def __init__(
+        self,
+        frontmatter_format: str = "legacy",
+        debug_dir: str = "_debug",
+        converter: str = DEFAULT_CONVERTER,
+    ):
+        if converter not in MARKDOWN_CONVERTERS:
+            raise ValueError(f"Unknown converter {converter!r}; choose from {', '.join(MARKDOWN_CONVERTERS)}")
+        self.frontmatter_format = frontmatter_format
+        self.debug_dir = debug_dir
+        # Only the name is stored, so the extractor stays picklable; each worker uses its own instance.
+        self.converter = converter
+
+    def __call__(self, post: Union[str, BeautifulSoup, dict], url: str = "") -> ExtractedPost:
+        if isinstance(post, dict):
+            return self.from_api(post)
+        raw_html = None
+        if isinstance(post, str):
+            raw_html = post
+            post = parse_post_html(post)
+        return self.from_soup(post, url, raw_html)
+
+    def from_soup(self, soup: BeautifulSoup, url: str = "", raw_html: Optional[str] = None) -> ExtractedPost:
+        """Extracts a post from its page soup, which may be restricted by :func:`parse_post_html`.
+
+        ``raw_html`` is the unparsed page, dumped for debugging if extraction fails.
+        """
+        parts = find_post_parts(soup)
+
+        # Title
+        title_element = parts.get("title")
+        if title_element is None and "content" in parts:
+            title_element = parts["content"].find("h2")
+        title = title_element.text.strip() if title_element else "Untitled"
+        title_found = title_element is not None
+
+        # Subtitle
+        subtitle_element = parts.get("subtitle")
+        subtitle = subtitle_element.text.strip() if subtitle_element else ""
+
+        # Date, Author, and Cover Image from ld+json (most reliable source)
+        date = ""
+        author = ""
+        cover_image = ""
+        script_tag = parts.get("ld_json")
+        if script_tag and script_tag.string:
+            try:
+                ld_json = json.loads(script_tag.string)
+                if "datePublished" in ld_json:
+                    date_str = ld_json["datePublished"]
+                    date_obj = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+                    date = date_obj.strftime("%Y-%m-%d")
+                if "author" in ld_json:
+                    authors = ld_json["author"]
+                    if isinstance(authors, list) and authors:
+                        author = authors[0].get("name", "")
+                    elif isinstance(authors, dict):
+                        author = authors.get("name", "")
+                if "image" in ld_json:
+                    images = ld_json["image"]
+                    if isinstance(images, list) and images:
+                        img = images[0]
+                        cover_image = img.get("url", "") if isinstance(img, dict) else str(img)
+                    elif isinstance(images, dict):
+                        cover_image = images.get("url", "")
+            except (json.JSONDecodeError, ValueError, KeyError):
+                pass
+
+        if not date:
+            date = "Date not found"
+
+        # Like count
+        likes_element = parts.get("likes")
+        like_count_element = likes_element.select_one('button div.label') if likes_element else None
+        like_count = (
+            like_count_element.text.strip()
+            if like_count_element and like_count_element.text.strip().isdigit()
+            else "0"
+        )
+
+        # Content
+        content_element = parts.get("content")
+        content_html = str(clean_post_content(content_element)) if content_element else ""
+        md = BaseSubstackScraper.html_to_md(content_html, self.converter)
+
+        # Diagnostic: detect extraction failure (missing title or empty content) and dump page
+        if not title_found or not content_element:
+            paywall = parts.get("paywall")
+            ld_script = parts.get("ld_json")
+            print(f"[EXTRACT FAIL] url={url}")
+            print(f"  title_found={title_found} title={title!r}")
+            print(f"  content_element_found={content_element is not None}")
+            print(f"  paywall_present={paywall is not None}")
+            print(f"  ld_json_present={ld_script is not None}")
+            print(f"  date={date!r} author={author!r}")
+            try:
+                os.makedirs(self.debug_dir, exist_ok=True)
+                slug = (get_post_slug(url) if url and is_post_url(url) else (url.rstrip('/').split('/')[-1] or "unknown"))
+                debug_path = os.path.join(self.debug_dir, f"{slug}.html")
+                with open(debug_path, "w", encoding="utf-8") as f:
+                    f.write(raw_html if raw_html is not None else str(soup))
+                print(f"  dumped raw HTML -> {debug_path}")
+            except Exception as dump_err:
+                print(f"  failed to dump debug HTML: {dump_err}")
+
+        md_content = BaseSubstackScraper.combine_metadata_and_content(
+            title, subtitle, date, author, cover_image, like_count, md, self.frontmatter_format
+        )
+
+        html_content = BaseSubstackScraper.combine_metadata_and_html(
+            title, subtitle, date, like_count, content_html
+        )
+
+        return ExtractedPost(
+            title, subtitle, author, date, cover_image, like_count, md_content, content_element is not None,
+            html_content,
+        )
+
+    def from_api(self, post: dict) -> ExtractedPost:
+        """Extracts a post from /api/v1/posts/<slug> JSON."""
+        title = (post.get("title") or "").strip() or "Untitled"
+        subtitle = (post.get("subtitle") or "").strip()
+
+        date = "Date not found"
+        if post.get("post_date"):
+            try:
+                date_obj = datetime.fromisoformat(post["post_date"].replace("Z", "+00:00"))
+                date = date_obj.strftime("%Y-%m-%d")
+            except ValueError:
+                pass
+
+        bylines = post.get("publishedBylines") or []
+        author = bylines[0].get("name", "") if bylines else ""
+        cover_image = post.get("cover_image") or ""
+
+        like_count = post.get("reaction_count")
+        if like_count is None:
+            like_count = sum((post.get("reactions") or {}).values())
+        like_count = str(like_count)
+
+        body = BeautifulSoup(post.get("body_html") or "", HTML_PARSER)
+        content_html = str(clean_post_content(body))
+        md = BaseSubstackScraper.html_to_md(content_html, self.converter)
+        md_content = BaseSubstackScraper.combine_metadata_and_content(
+            title, subtitle, date, author, cover_image, like_count, md, self.frontmatter_format
+        )
+        html_content = BaseSubstackScraper.combine_metadata_and_html(
+            title, subtitle, date, like_count, content_html
+        )
+        return ExtractedPost(
+            title, subtitle, author, date, cover_image, like_count, md_content, bool(post.get("body_html")),
+            html_content,
+        )
+
+
 # =============================================================================
 # BASE SCRAPER CLASS
 # =============================================================================
@@ -735,10 +2791,38 @@ class BaseSubstackScraper(ABC):
         html_save_dir: str,
         download_images: bool = False,
         frontmatter_format: str = "legacy",
+        workers: int = NUM_WORKERS,
+        session: Optional[requests.Session] = None,
+        use_api: bool = False,
+        incremental: bool = False,
+        stream_discovery: bool = False,
+        processes: int = 0,
+        queue_size: int = 0,
+        converter: str = DEFAULT_CONVERTER,
+        image_workers: int = IMAGE_WORKERS,
+        image_policy: Optional[ImagePolicy] = None,
+        image_transcode: Optional[ImageTranscode] = None,
+        search_index: bool = True,
+        buffer_size: int = WRITE_BUFFER_SIZE,
     ):
         if frontmatter_format not in ("legacy", "mdx"):
             raise ValueError("frontmatter_format must be 'legacy' or 'mdx'")
+        if workers < 1 or image_workers < 1:
+            raise ValueError("workers and image_workers must be at least 1")
+        if processes < 0 or queue_size < 0:
+            raise ValueError("processes and queue_size must not be negative")
         self.frontmatter_format: str = frontmatter_format
+        self.workers: int = workers
+        self.processes: int = processes
+        # Posts fetched or being converted at once; defaults to enough to keep every stage busy.
+        self.queue_size: int = queue_size or 2 * max(workers, processes)
+        self.use_api: bool = use_api
+        self.incremental: bool = incremental
+        self.stream_discovery: bool = stream_discovery and not is_post_url(base_substack_url)
+        self.session: requests.Session = session or create_http_session(
+            pool_maxsize=max(HTTP_POOL_SIZE, workers)
+        )
+        self.rate_limiter: RateLimiter = getattr(self.session, "rate_limiter", None) or RateLimiter()
         self.is_single_post: bool = is_post_url(base_substack_url)
         self.post_slug: Optional[str] = get_post_slug(base_substack_url) if self.is_single_post else None
         original_url = base_substack_url
@@ -755,6 +2839,12 @@ class BaseSubstackScraper(ABC):
 
         self.md_save_dir: str = md_save_dir
         self.html_save_dir: str = f"{html_save_dir}/{self.writer_name}"
+        # Fails early if the chosen backend isn't installed.
+        get_converter(converter)
+        self.extractor = PostExtractor(
+            frontmatter_format, os.path.join(os.path.dirname(md_save_dir), "_debug", self.writer_name),
+            converter=converter,
+        )
 
         if not os.path.exists(md_save_dir):
             os.makedirs(md_save_dir)
@@ -764,39 +2854,215 @@ class BaseSubstackScraper(ABC):
             print(f"Created html directory {self.html_save_dir}")
 
         self.download_images: bool = download_images
+        self.image_workers: int = image_workers
+        self.image_policy: Optional[ImagePolicy] = image_policy
+        self.image_transcode: Optional[ImageTranscode] = image_transcode
+        self.search_index: bool = search_index
+        self.buffer_size: int = buffer_size
         self.image_dir = Path(BASE_IMAGE_DIR) / self.writer_name
+        # Last-modified time per post URL, when discovery provides one.
+        self.post_lastmod: Dict[str, str] = {}
+        self.manifest = SyncManifest.for_author(self.writer_name)
+        # Posts whose saved files --verify found damaged; fetched and overwritten whatever the mode.
+        self.refetch_urls: set = set()
 
         if self.is_single_post:
             self.post_urls: List[str] = [original_url]
         else:
             self.keywords: List[str] = ["about", "archive", "podcast"]
-            self.post_urls: List[str] = self.get_all_post_urls()
+            # When streaming, discovery runs lazily inside scrape_posts and fills this list.
+            self.post_urls: List[str] = [] if stream_discovery else self.get_all_post_urls()
 
     def get_all_post_urls(self) -> List[str]:
-        """Attempts to fetch URLs from sitemap.xml, falling back to feed.xml if necessary."""
-        urls = self.fetch_urls_from_sitemap()
-        if not urls:
-            urls = self.fetch_urls_from_feed()
-        return self.filter_urls(urls, self.keywords)
+        """Attempts to fetch URLs from sitemap.xml, falling back to the archive API and then feed.xml.
 
-    def fetch_urls_from_sitemap(self) -> List[str]:
-        """Fetches URLs from sitemap.xml."""
-        sitemap_url = f"{self.base_substack_url}sitemap.xml"
-        response = requests.get(sitemap_url)
+        In API mode the archive endpoint is tried first.
+        """
+        return list(self.iter_post_urls())
 
-        if not response.ok:
-            print(f'Error fetching sitemap at {sitemap_url}: {response.status_code}')
+    def iter_post_urls(self) -> Iterator[str]:
+        """Yields filtered, de-duplicated post URLs as discovery finds them.
+
+        Sitemap URLs are streamed, so callers can start fetching posts before the
+        whole sitemap (or sitemap index) has been downloaded. Sources are tried in
+        the same order as :meth:`get_all_post_urls`.
+        """
+        seen = set()
+
+        def wanted(urls: Iterable[str]) -> Iterator[str]:
+            for url in urls:
+                if url not in seen and self.filter_urls([url], self.keywords):
+                    seen.add(url)
+                    yield url
+
+        if self.use_api:
+            urls = self.fetch_urls_from_archive()
+            if urls:
+                yield from wanted(urls)
+                return
+
+        found = False
+        for loc, lastmod in self.iter_sitemap_entries(f"{self.base_substack_url}sitemap.xml"):
+            found = True
+            if lastmod:
+                self.post_lastmod[loc] = lastmod
+            yield from wanted([loc])
+        if found:
+            return
+
+        if not self.use_api:
+            urls = self.fetch_urls_from_archive()
+            if urls:
+                yield from wanted(urls)
+                return
+
+        yield from wanted(self.fetch_urls_from_feed())
+
+    def fetch_archive_page(self, offset: int, limit: Optional[int] = None, max_attempts: int = 5) -> List[dict]:
+        """Fetches one page of post summaries from the publication's /api/v1/archive endpoint.
+
+        Throttled (HTTP 429) and server-error responses are retried, paced by the
+        rate limiter's backoff. Other errors, or running out of attempts, raise
+        ``requests.HTTPError`` rather than passing for the end of the archive.
+        """
+        limit = limit or API_ARCHIVE_PAGE_SIZE
+        for attempt in range(1, max_attempts + 1):
+            response = self.session.get(
+                f"{self.base_substack_url}api/v1/archive",
+                params={"sort": "new", "offset": offset, "limit": limit},
+            )
+            if response.ok:
+                return response.json()
+            if attempt == max_attempts or (response.status_code != 429 and response.status_code < 500):
+                response.raise_for_status()
+            if not is_throttled_response(response):
+                # Throttles are recorded by the session's rate limiter; back off on server errors too.
+                self.rate_limiter.record_throttle(response.url)
+            print(f"[{attempt}/{max_attempts}] Archive page at offset {offset} failed "
+                  f"(HTTP {response.status_code}), retrying...")
+
+    def fetch_archive_entries(self) -> List[ArchiveEntry]:
+        """Pages through /api/v1/archive, fetching ``self.workers`` pages at a time.
+
+        Stops at the first page shorter than the page size and returns the posts
+        de-duplicated by URL, newest first. A page that can't be fetched raises
+        (see :meth:`fetch_archive_page`) instead of ending the archive early.
+        """
+        limit = API_ARCHIVE_PAGE_SIZE
+        entries: Dict[str, ArchiveEntry] = {}
+        offset = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="archive") as executor:
+            while True:
+                offsets = [offset + i * limit for i in range(self.workers)]
+                futures = [executor.submit(self.fetch_archive_page, o, limit) for o in offsets]
+                # Pages are read in order, so a failure past the archive's end (in the same batch)
+                # is never looked at once a short page has been reached.
+                for page in (future.result() for future in futures):
+                    for post in page:
+                        url = post.get("canonical_url")
+                        if url and url not in entries:
+                            published = post.get("post_date") or ""
+                            entries[url] = ArchiveEntry(url, published, post.get("updated_at") or published)
+                    if len(page) < limit:
+                        return list(entries.values())
+                offset += len(offsets) * limit
+
+    def fetch_urls_from_archive(self) -> List[str]:
+        """Fetches every post URL from the archive API, recording their update times."""
+        try:
+            entries = self.fetch_archive_entries()
+        except (requests.RequestException, ValueError) as e:
+            print(f'Error fetching archive: {e}')
             return []
+        for entry in entries:
+            if entry.updated:
+                self.post_lastmod[entry.url] = entry.updated
+        return [entry.url for entry in entries]
 
-        root = ET.fromstring(response.content)
-        urls = [element.text for element in root.iter('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')]
+    def fetch_urls_from_sitemap(self) -> List[str]:
+        """Fetches URLs from sitemap.xml, following nested sitemaps."""
+        urls = []
+        for loc, lastmod in self.iter_sitemap_entries(f"{self.base_substack_url}sitemap.xml"):
+            urls.append(loc)
+            if lastmod:
+                self.post_lastmod[loc] = lastmod
         return urls
 
+    def parse_sitemap(self, sitemap_url: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """Streams one sitemap, yielding ``(kind, loc, lastmod)`` per entry.
+
+        ``kind`` is ``"url"`` for pages and ``"sitemap"`` for the children of a
+        sitemap index. Elements are cleared as soon as they're read, so memory use
+        doesn't grow with the sitemap.
+        """
+        with self.session.get(sitemap_url, stream=True) as response:
+            if not response.ok:
+                print(f'Error fetching sitemap at {sitemap_url}: {response.status_code}')
+                return
+            response.raw.decode_content = True
+            for _, element in ET.iterparse(response.raw, events=("end",)):
+                if element.tag in (f'{SITEMAP_NS}url', f'{SITEMAP_NS}sitemap'):
+                    loc = element.findtext(f'{SITEMAP_NS}loc')
+                    lastmod = element.findtext(f'{SITEMAP_NS}lastmod')
+                    if loc:
+                        kind = "url" if element.tag == f'{SITEMAP_NS}url' else "sitemap"
+                        yield kind, loc.strip(), lastmod.strip() if lastmod else None
+                    element.clear()
+
+    def iter_sitemap_entries(self, sitemap_url: str) -> Iterator[Tuple[str, Optional[str]]]:
+        """Yields ``(loc, lastmod)`` for every page in a sitemap as it is parsed.
+
+        Child sitemaps of a sitemap index are parsed concurrently on up to
+        ``self.workers`` threads; entries are yielded in the order they arrive.
+        """
+        entries: "queue.Queue" = queue.Queue()
+        done = object()
+        stop = threading.Event()
+        lock = threading.Lock()
+        scheduled = 0
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sitemap")
+
+        def parse(url: str) -> None:
+            try:
+                for kind, loc, lastmod in self.parse_sitemap(url):
+                    if stop.is_set():
+                        break
+                    if kind == "sitemap":
+                        schedule(loc)
+                    else:
+                        entries.put((loc, lastmod))
+            except (requests.RequestException, ET.ParseError) as e:
+                print(f'Error parsing sitemap at {url}: {e}')
+            finally:
+                entries.put(done)
+
+        def schedule(url: str) -> None:
+            nonlocal scheduled
+            with lock:
+                scheduled += 1
+            executor.submit(parse, url)
+
+        schedule(sitemap_url)
+        finished = 0
+        try:
+            while True:
+                item = entries.get()
+                if item is done:
+                    finished += 1
+                    with lock:
+                        if finished == scheduled:
+                            return
+                    continue
+                yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def fetch_urls_from_feed(self) -> List[str]:
         """Fetches URLs from feed.xml."""
         print('Falling back to feed.xml. This will only contain up to the 22 most recent posts.')
         feed_url = f"{self.base_substack_url}feed.xml"
-        response = requests.get(feed_url)
+        response = self.session.get(feed_url)
 
         if not response.ok:
             print(f'Error fetching feed at {feed_url}: {response.status_code}')
@@ -817,32 +3083,35 @@ class BaseSubstackScraper(ABC):
         return [url for url in urls if all(keyword not in url for keyword in keywords)]
 
     @staticmethod
-    def html_to_md(html_content: str) -> str:
-        """Converts HTML to Markdown."""
+    def html_to_md(html_content: str, converter: str = DEFAULT_CONVERTER) -> str:
+        """Converts HTML to Markdown with the named backend (see :func:`get_converter`)."""
         if not isinstance(html_content, str):
             raise ValueError("html_content must be a string")
-        h = html2text.HTML2Text()
-        h.ignore_links = False
-        h.body_width = 0
-        return h.handle(html_content)
+        return get_converter(converter).convert(html_content)
 
     @staticmethod
-    def save_to_file(filepath: str, content: str) -> None:
+    def save_to_file(
+        filepath: str, content: str, overwrite: bool = False, buffer_size: int = WRITE_BUFFER_SIZE
+    ) -> None:
         """Saves content to a file."""
         if not isinstance(filepath, str):
             raise ValueError("filepath must be a string")
         if not isinstance(content, str):
             raise ValueError("content must be a string")
-        if os.path.exists(filepath):
+        if not overwrite and os.path.exists(filepath):
             print(f"File already exists: {filepath}")
             return
-        with open(filepath, 'w', encoding='utf-8') as file:
+        with atomic_open(filepath, 'w', buffer_size, encoding='utf-8') as file:
             file.write(content)
 
     @staticmethod
     def md_to_html(md_content: str) -> str:
         """Converts Markdown to HTML."""
-        return markdown.markdown(md_content, extensions=['extra'])
+        renderer = get_markdown_renderer()
+        try:
+            return renderer.convert(md_content)
+        finally:
+            renderer.reset()
 
     def save_to_html_file(self, filepath: str, content: str) -> None:
         """Saves HTML content to a file with a link to an external CSS file."""
@@ -872,7 +3141,7 @@ class BaseSubstackScraper(ABC):
             </html>
         """
 
-        with open(filepath, 'w', encoding='utf-8') as file:
+        with atomic_open(filepath, 'w', self.buffer_size, encoding='utf-8') as file:
             file.write(html_content)
 
     @staticmethod
@@ -926,12 +3195,7 @@ class BaseSubstackScraper(ABC):
             return frontmatter + content
 
         # legacy format
-        display_date = date
-        if date and date != "Date not found":
-            try:
-                display_date = datetime.fromisoformat(date).strftime("%b %d, %Y")
-            except ValueError:
-                pass
+        display_date = BaseSubstackScraper.format_display_date(date)
 
         metadata = f"# {title}\n\n"
         if subtitle:
@@ -940,109 +3204,297 @@ class BaseSubstackScraper(ABC):
         metadata += f"**Likes:** {like_count}\n\n"
         return metadata + content
 
+    @staticmethod
+    def combine_metadata_and_html(
+        title: str, subtitle: str, date: str, like_count: str, content_html: str
+    ) -> str:
+        """Renders the legacy Markdown header as HTML ahead of a cleaned post body."""
+        header = f"<h1>{escape(title)}</h1>\n"
+        if subtitle:
+            header += f"<h2>{escape(subtitle)}</h2>\n"
+        header += f"<p><strong>{escape(BaseSubstackScraper.format_display_date(date))}</strong></p>\n"
+        header += f"<p><strong>Likes:</strong> {escape(like_count)}</p>\n"
+        return header + content_html
+
+    @staticmethod
+    def format_display_date(date: str) -> str:
+        """Formats an ISO date as e.g. ``Feb 03, 2024``, passing anything else through."""
+        if date and date != "Date not found":
+            try:
+                return datetime.fromisoformat(date).strftime("%b %d, %Y")
+            except ValueError:
+                pass
+        return date
+
     def extract_post_data(self, soup: BeautifulSoup, url: str = "") -> Tuple[str, str, str, str, str, str, str]:
         """Converts a Substack post soup to markdown.
 
         Returns:
             ``(title, subtitle, author, date, cover_image, like_count, md_content)``.
         """
-        # Title
-        title_element = soup.select_one("h1.post-title, h2")
-        title = title_element.text.strip() if title_element else "Untitled"
-        title_found = title_element is not None
+        return tuple(self.extractor.from_soup(soup, url)[:7])
 
-        # Subtitle
-        subtitle_element = soup.select_one("h3.subtitle, div.subtitle-HEEcLo")
-        subtitle = subtitle_element.text.strip() if subtitle_element else ""
+    def extract_api_post_data(self, post: dict) -> Tuple[str, str, str, str, str, str, str]:
+        """Converts a post from /api/v1/posts/<slug> to markdown.
 
-        # Date, Author, and Cover Image from ld+json (most reliable source)
-        date = ""
-        author = ""
-        cover_image = ""
-        script_tag = soup.find("script", {"type": "application/ld+json"})
-        if script_tag and script_tag.string:
-            try:
-                ld_json = json.loads(script_tag.string)
-                if "datePublished" in ld_json:
-                    date_str = ld_json["datePublished"]
-                    date_obj = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-                    date = date_obj.strftime("%Y-%m-%d")
-                if "author" in ld_json:
-                    authors = ld_json["author"]
-                    if isinstance(authors, list) and authors:
-                        author = authors[0].get("name", "")
-                    elif isinstance(authors, dict):
-                        author = authors.get("name", "")
-                if "image" in ld_json:
-                    images = ld_json["image"]
-                    if isinstance(images, list) and images:
-                        img = images[0]
-                        cover_image = img.get("url", "") if isinstance(img, dict) else str(img)
-                    elif isinstance(images, dict):
-                        cover_image = images.get("url", "")
-            except (json.JSONDecodeError, ValueError, KeyError):
-                pass
+        Returns:
+            The same tuple as :meth:`extract_post_data`.
+        """
+        return tuple(self.extractor.from_api(post)[:7])
 
-        if not date:
-            date = "Date not found"
+    def extract_post(self, post: Union[str, BeautifulSoup, dict], url: str) -> ExtractedPost:
+        """Extracts a post fetched by :meth:`fetch_post`, from either the API or HTML."""
+        return self.extractor(post, url)
 
-        # Like count
-        like_count_element = soup.select_one('div.like-button-container button div.label')
-        like_count = (
-            like_count_element.text.strip()
-            if like_count_element and like_count_element.text.strip().isdigit()
-            else "0"
-        )
+    def get_post_json(self, url: str) -> Optional[dict]:
+        """Fetches a post from /api/v1/posts/<slug>.
 
-        # Content
-        content_element = soup.select_one("div.available-content")
-        content_html = str(content_element) if content_element else ""
-        md = self.html_to_md(content_html)
+        Returns ``None`` when the API can't serve the full post, e.g. paywalled posts.
+        """
+        response = self.session.get(f"{self.base_substack_url}api/v1/posts/{get_post_slug(url)}")
+        if not response.ok:
+            return None
+        post = response.json()
+        if not isinstance(post, dict) or not post.get("body_html") or post.get("audience") == "only_paid":
+            return None
+        return post
 
-        # Diagnostic: detect extraction failure (missing title or empty content) and dump page
-        if not title_found or not content_element:
-            paywall = soup.select_one("h2.paywall-title")
-            ld_script = soup.find("script", {"type": "application/ld+json"})
-            print(f"[EXTRACT FAIL] url={url}")
-            print(f"  title_found={title_found} title={title!r}")
-            print(f"  content_element_found={content_element is not None}")
-            print(f"  paywall_present={paywall is not None}")
-            print(f"  ld_json_present={ld_script is not None}")
-            print(f"  date={date!r} author={author!r}")
+    def fetch_post(self, url: str) -> Optional[Union[str, dict]]:
+        """Fetches a post as API JSON in API mode, falling back to the page HTML per post.
+
+        Returns raw data only, so that parsing can run off the fetch thread.
+        """
+        if self.use_api:
             try:
-                debug_dir = os.path.join(os.path.dirname(self.md_save_dir), "_debug", self.writer_name)
-                os.makedirs(debug_dir, exist_ok=True)
-                slug = (get_post_slug(url) if url and is_post_url(url) else (url.rstrip('/').split('/')[-1] or "unknown"))
-                debug_path = os.path.join(debug_dir, f"{slug}.html")
-                with open(debug_path, "w", encoding="utf-8") as f:
-                    f.write(str(soup))
-                print(f"  dumped raw HTML -> {debug_path}")
-            except Exception as dump_err:
-                print(f"  failed to dump debug HTML: {dump_err}")
+                post = self.get_post_json(url)
+                if post is not None:
+                    return post
+            except (requests.RequestException, ValueError) as e:
+                print(f"API fetch failed for {url}, falling back to HTML: {e}")
+        return self.get_url_html(url)
 
-        md_content = self.combine_metadata_and_content(
-            title, subtitle, date, author, cover_image, like_count, md, self.frontmatter_format
-        )
+    def fetch_html_over_http(self, url: str, max_attempts: int = 5) -> str:
+        """Gets page HTML using requests, backing off through the shared rate limiter.
 
-        return title, subtitle, author, date, cover_image, like_count, md_content
+        Paywalled pages are returned as-is; callers decide what to do with them.
+        """
+        for attempt in range(1, max_attempts + 1):
+            try:
+                page = self.session.get(url)
+                if is_throttled_response(page):
+                    # The session's rate limiter has already recorded the throttle.
+                    print(f"[{attempt}/{max_attempts}] Too many requests (HTTP {page.status_code}): {url}")
+                    continue
+
+                html = decode_html(page)
+
+                if is_rate_limited_html(html):
+                    self.rate_limiter.record_throttle(url)
+                    print(f"[{attempt}/{max_attempts}] Too many requests. Slowing down to "
+                          f"{self.rate_limiter.current_rate(url):.2f} requests/s...")
+                    continue
+
+                return html
+            except Exception as e:
+                raise ValueError(f"Error fetching page: {e}") from e
+
+        raise RuntimeError(f"Max attempts reached for URL: {url}. Too many requests.")
+
+    def get_url_html(self, url: str) -> Optional[str]:
+        """Gets a post page's HTML, or ``None`` to skip the post.
+
+        Defaults to serializing :meth:`get_url_soup`; scrapers override this to
+        return the page without parsing it.
+        """
+        soup = self.get_url_soup(url)
+        return None if soup is None else str(soup)
 
     @abstractmethod
     def get_url_soup(self, url: str) -> str:
         raise NotImplementedError
 
     def save_essays_data_to_json(self, essays_data: list) -> None:
-        """Saves essays data to a JSON file for a specific author."""
-        data_dir = os.path.join(JSON_DATA_DIR)
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-
-        json_path = os.path.join(data_dir, f'{self.writer_name}.json')
-        if os.path.exists(json_path):
-            with open(json_path, 'r', encoding='utf-8') as file:
-                existing_data = json.load(file)
-            essays_data = existing_data + [data for data in essays_data if data not in existing_data]
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(essays_data, f, ensure_ascii=False, indent=4)
+        """Upserts essays into the post catalog and exports the author's JSON file from it."""
+        json_path = os.path.join(JSON_DATA_DIR, f'{self.writer_name}.json')
+        with PostCatalog.open_default() as catalog:
+            catalog.import_legacy_json(self.writer_name, json_path)
+            catalog.upsert(self.writer_name, essays_data)
+            catalog.export_json(self.writer_name, json_path)
+
+    def get_post_filepaths(self, url: str) -> Tuple[str, str]:
+        """Returns the ``(md_filepath, html_filepath)`` a post URL is saved to."""
+        md_filename = self.get_filename_from_url(url, filetype=".md")
+        html_filename = self.get_filename_from_url(url, filetype=".html")
+        return (
+            os.path.join(self.md_save_dir, md_filename),
+            os.path.join(self.html_save_dir, html_filename),
+        )
+
+    def verify_outputs(self) -> None:
+        """Finds truncated artifacts from interrupted runs and marks them to be fetched again.
+
+        Image blobs are rehashed and re-fetched in place (see :meth:`ImageStore.verify`).
+        A synced post whose Markdown no longer matches its recorded content hash,
+        or whose HTML page exists but is truncated, loses its sync record and is
+        fetched and overwritten by the scrape that follows. Files are never
+        deleted: a missing HTML page alone (another output directory, or posts
+        synced before HTML pages were written) is not a reason to re-fetch.
+        """
+        store = ImageStore.default(self.buffer_size)
+        if store.root.exists():
+            checked, refetched = store.verify(self.session, Path(BASE_IMAGE_DIR))
+            print(f"Verified {checked} stored images, re-fetched {refetched}")
+
+        for url, entry in list(self.manifest.entries.items()):
+            md_path = Path(entry.get("md_path", ""))
+            html_path = Path(entry.get("html_path", ""))
+            md_intact = False
+            if md_path.is_file():
+                md = md_path.read_text(encoding='utf-8', errors='replace')
+                md_intact = hashlib.sha256(md.encode('utf-8')).hexdigest() == entry.get("content_hash")
+            html_intact = True
+            if html_path.is_file():
+                with open(html_path, 'rb') as file:
+                    file.seek(max(0, html_path.stat().st_size - 64))
+                    html_intact = b"</html>" in file.read()
+            if not (md_intact and html_intact):
+                del self.manifest.entries[url]
+                self.refetch_urls.add(url)
+        if self.refetch_urls:
+            self.manifest.save()
+        print(f"Marked {len(self.refetch_urls)} incomplete posts for re-fetching")
+
+    def should_fetch(self, url: str) -> bool:
+        """Whether a post needs fetching.
+
+        Incremental runs consult only the sync manifest: new posts and posts whose
+        lastmod moved are fetched. Otherwise any post without a markdown file is.
+        Posts :meth:`verify_outputs` found damaged are always fetched.
+        """
+        if url in self.refetch_urls:
+            return True
+        if self.incremental:
+            return self.manifest.needs_fetch(url, self.post_lastmod.get(url))
+        md_filepath, _ = self.get_post_filepaths(url)
+        return not os.path.exists(md_filepath)
+
+    def process_post(self, url: str, extractor: PostExtractor) -> Optional[ExtractedPost]:
+        """Fetches and extracts one post in the calling thread; ``None`` skips it."""
+        post = self.fetch_post(url)
+        return None if post is None else extractor(post, url)
+
+    def iter_post_fetches(
+        self, urls: Iterable[str]
+    ) -> Iterator[Tuple[str, Optional[Callable[[], Optional[ExtractedPost]]]]]:
+        """Yields ``(url, fetch)`` pairs in input order.
+
+        ``fetch`` is ``None`` for posts that don't need fetching (see
+        :meth:`should_fetch`), otherwise a callable returning the post's
+        :class:`ExtractedPost`, or ``None`` if the post should be skipped.
+
+        Pages are fetched by ``self.workers`` threads. With ``self.processes``,
+        each page is handed to a process pool for parsing and conversion as soon
+        as it arrives; otherwise that work happens when ``fetch`` is called. At
+        most ``self.queue_size`` posts are in flight or waiting to be consumed,
+        which bounds memory. Closing the generator cancels anything not yet started.
+        """
+        extractor = self.extractor
+
+        if self.workers <= 1 and self.processes == 0:
+            for url in urls:
+                if self.should_fetch(url):
+                    yield url, (lambda u=url: self.process_post(u, extractor))
+                else:
+                    yield url, None
+            return
+
+        fetch_pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fetch")
+        process_pool = ProcessPoolExecutor(max_workers=self.processes) if self.processes else None
+
+        def submit(url: str) -> Callable[[], Optional[ExtractedPost]]:
+            fetched = fetch_pool.submit(self.fetch_post, url)
+            if process_pool is None:
+                def extract() -> Optional[ExtractedPost]:
+                    post = fetched.result()
+                    return None if post is None else extractor(post, url)
+                return extract
+
+            extracted: Future = Future()
+
+            def on_fetched(done: Future) -> None:
+                try:
+                    post = done.result()
+                    if post is None:
+                        extracted.set_result(None)
+                        return
+                    process_pool.submit(extractor, post, url).add_done_callback(on_extracted)
+                except BaseException as e:
+                    extracted.set_exception(e)
+
+            def on_extracted(done: Future) -> None:
+                try:
+                    extracted.set_result(done.result())
+                except BaseException as e:
+                    extracted.set_exception(e)
+
+            fetched.add_done_callback(on_fetched)
+            return extracted.result
+
+        pending = deque()
+        in_flight = 0
+        try:
+            for url in urls:
+                if self.should_fetch(url):
+                    pending.append((url, submit(url)))
+                    in_flight += 1
+                else:
+                    pending.append((url, None))
+                while in_flight >= self.queue_size:
+                    url_done, fetch = pending.popleft()
+                    if fetch is not None:
+                        in_flight -= 1
+                    yield url_done, fetch
+            while pending:
+                yield pending.popleft()
+        finally:
+            fetch_pool.shutdown(wait=True, cancel_futures=True)
+            if process_pool is not None:
+                process_pool.shutdown(wait=True, cancel_futures=True)
+
+    def iter_limited_post_fetches(
+        self, urls: Iterable[str], limit: int, counted: Callable[[], int]
+    ) -> Iterator[Tuple[str, Optional[Callable[[], Optional[ExtractedPost]]]]]:
+        """Like :meth:`iter_post_fetches`, but fetches no more posts than are still needed.
+
+        ``counted()`` returns how many posts the consumer has counted towards
+        ``limit`` so far. URLs are handed to the workers in batches of the
+        posts still missing; posts skipped without being counted (e.g.
+        paywalled ones) are made up for by the next batch.
+        """
+        if not limit:
+            yield from self.iter_post_fetches(urls)
+            return
+        urls = iter(urls)
+        while counted() < limit:
+            batch = self.iter_post_fetches(islice(urls, limit - counted()))
+            fetched = False
+            try:
+                for item in batch:
+                    fetched = True
+                    yield item
+            finally:
+                batch.close()
+            if not fetched:
+                return
+
+    def iter_discovered_urls(self, pbar, grow_total: bool) -> Iterator[str]:
+        """Streams :meth:`iter_post_urls` into ``self.post_urls``, growing the progress bar's total."""
+        for url in self.iter_post_urls():
+            self.post_urls.append(url)
+            if grow_total:
+                pbar.total += 1
+                pbar.refresh()
+            yield url
 
     def scrape_posts(self, num_posts_to_scrape: int = 0) -> None:
         """Iterates over all posts and saves them as markdown and html files."""
@@ -1050,66 +3502,123 @@ class BaseSubstackScraper(ABC):
         count = 0
         total = num_posts_to_scrape if num_posts_to_scrape != 0 else len(self.post_urls)
         with tqdm(total=total, desc="Scraping posts") as pbar:
-            for url in self.post_urls:
+            if self.stream_discovery:
+                urls = self.iter_discovered_urls(pbar, grow_total=num_posts_to_scrape == 0)
+            else:
+                urls = self.post_urls
+            fetches = self.iter_limited_post_fetches(urls, num_posts_to_scrape, lambda: count)
+            search_index = None
+            if self.search_index:
                 try:
-                    md_filename = self.get_filename_from_url(url, filetype=".md")
-                    html_filename = self.get_filename_from_url(url, filetype=".html")
-                    md_filepath = os.path.join(self.md_save_dir, md_filename)
-                    html_filepath = os.path.join(self.html_save_dir, html_filename)
-
-                    if not os.path.exists(md_filepath):
-                        soup = self.get_url_soup(url)
-                        if soup is None:
-                            total += 1
-                            pbar.total = total
-                            pbar.refresh()
-                            continue
-
-                        title, subtitle, author, date, cover_image, like_count, md = self.extract_post_data(soup, url)
-
-                        # Skip writing if extraction clearly failed — leaves no stale file so reruns retry.
-                        content_element = soup.select_one("div.available-content")
-                        if title == "Untitled" or content_element is None:
-                            pbar.write(f"[SKIP] Extraction failed for {url} (title={title!r}, content_present={content_element is not None}). See _debug dump.")
-                            count += 1
-                            pbar.update(1)
-                            if num_posts_to_scrape != 0 and count == num_posts_to_scrape:
-                                break
-                            continue
-
-                        if self.download_images:
-                            total_images = count_images_in_markdown(md)
-                            slug = get_post_slug(url) if is_post_url(url) else url.rstrip('/').split('/')[-1]
-                            with tqdm(
-                                total=total_images,
-                                desc=f"Downloading images for {slug}",
-                                leave=False,
-                            ) as img_pbar:
-                                md = process_markdown_images(md, self.writer_name, slug, img_pbar)
-
-                        self.save_to_file(md_filepath, md)
-                        html_content = self.md_to_html(md)
-                        self.save_to_html_file(html_filepath, html_content)
-
-                        essays_data.append({
-                            "title": title,
-                            "subtitle": subtitle,
-                            "author": author,
-                            "date": date,
-                            "cover_image": cover_image,
-                            "like_count": like_count,
-                            "file_link": md_filepath,
-                            "html_link": html_filepath
-                        })
-                    else:
-                        pbar.write(f"File already exists: {md_filepath}")
-                except Exception as e:
-                    pbar.write(f"Error scraping post: {e}")
-
-                count += 1
-                pbar.update(1)
-                if num_posts_to_scrape != 0 and count == num_posts_to_scrape:
-                    break
+                    search_index = SearchIndex.open_default()
+                except sqlite3.OperationalError as e:
+                    print(f"Search index unavailable, not indexing posts: {e}")
+            image_queue = None
+            if self.download_images:
+                transcoder = (
+                    ImageTranscoder(self.image_transcode, self.processes or None)
+                    if self.image_transcode else None
+                )
+                image_queue = ImageDownloadQueue(
+                    self.image_workers,
+                    self.session,
+                    ImageStore.default(self.buffer_size),
+                    self.image_policy,
+                    transcoder,
+                    self.buffer_size,
+                )
+            try:
+                for url, fetch in fetches:
+                    try:
+                        md_filepath, html_filepath = self.get_post_filepaths(url)
+
+                        if fetch is not None:
+                            post = fetch()
+                            if post is None:
+                                pbar.total += 1
+                                pbar.refresh()
+                                continue
+
+                            title, subtitle, author, date, cover_image, like_count, md = post[:7]
+
+                            # Skip writing if extraction clearly failed — leaves no stale file so reruns retry.
+                            if title == "Untitled" or not post.content_present:
+                                pbar.write(f"[SKIP] Extraction failed for {url} (title={title!r}, content_present={post.content_present}). See _debug dump.")
+                                count += 1
+                                pbar.update(1)
+                                if num_posts_to_scrape != 0 and count == num_posts_to_scrape:
+                                    break
+                                continue
+
+                            html_content = post.html_content
+                            thumbnail = None
+                            if image_queue is not None:
+                                slug = get_post_slug(url) if is_post_url(url) else url.rstrip('/').split('/')[-1]
+                                md = process_markdown_images(
+                                    md, self.writer_name, slug, session=self.session, queue=image_queue
+                                )
+                                if html_content is not None:
+                                    html_content = process_html_images(
+                                        html_content, self.writer_name, slug, os.path.dirname(html_filepath),
+                                        session=self.session, queue=image_queue,
+                                    )
+                                if image_queue.transcoder is not None and cover_image:
+                                    thumbnail = image_queue.thumbnail_path(localize_image(
+                                        cover_image, self.writer_name, slug, session=self.session, queue=image_queue
+                                    ))
+
+                            content_hash = hashlib.sha256(md.encode('utf-8')).hexdigest()
+                            if content_hash != self.manifest.content_hash(url) or not os.path.exists(md_filepath):
+                                self.save_to_file(
+                                    md_filepath,
+                                    md,
+                                    overwrite=self.incremental or url in self.refetch_urls,
+                                    buffer_size=self.buffer_size,
+                                )
+                                if html_content is None:
+                                    html_content = self.md_to_html(md)
+                                self.save_to_html_file(html_filepath, html_content)
+                            self.manifest.record(
+                                url, self.post_lastmod.get(url), content_hash, md_filepath, html_filepath
+                            )
+                            if search_index is not None:
+                                search_index.add(
+                                    url, self.writer_name, title, subtitle, author, date, md_filepath, md
+                                )
+
+                            essay = {
+                                "url": url,
+                                "title": title,
+                                "subtitle": subtitle,
+                                "author": author,
+                                "date": date,
+                                "cover_image": cover_image,
+                                "like_count": like_count,
+                                "file_link": md_filepath,
+                                "html_link": html_filepath
+                            }
+                            if thumbnail is not None:
+                                essay["thumbnail"] = thumbnail.as_posix()
+                            essays_data.append(essay)
+                        elif not self.incremental:
+                            pbar.write(f"File already exists: {md_filepath}")
+                    except Exception as e:
+                        pbar.write(f"Error scraping post: {e}")
+
+                    count += 1
+                    pbar.update(1)
+                    if num_posts_to_scrape != 0 and count == num_posts_to_scrape:
+                        break
+            finally:
+                fetches.close()
+                self.manifest.save()
+                if search_index is not None:
+                    search_index.close()
+                if image_queue is not None:
+                    image_queue.close()
+        for host, stats in self.rate_limiter.metrics().items():
+            print(f"Rate limiter [{host}]: {stats['rate']:.2f} requests/s, "
+                  f"{stats['requests']} requests, {stats['throttle_events']} throttle events")
         self.save_essays_data_to_json(essays_data=essays_data)
         generate_html_file(author_name=self.writer_name)
 
@@ -1126,39 +3635,38 @@ class SubstackScraper(BaseSubstackScraper):
         html_save_dir: str,
         download_images: bool = False,
         frontmatter_format: str = "legacy",
+        workers: int = NUM_WORKERS,
+        session: Optional[requests.Session] = None,
+        use_api: bool = False,
+        incremental: bool = False,
+        stream_discovery: bool = False,
+        processes: int = 0,
+        queue_size: int = 0,
+        converter: str = DEFAULT_CONVERTER,
+        image_workers: int = IMAGE_WORKERS,
+        image_policy: Optional[ImagePolicy] = None,
+        image_transcode: Optional[ImageTranscode] = None,
+        search_index: bool = True,
+        buffer_size: int = WRITE_BUFFER_SIZE,
     ):
         super().__init__(
-            base_substack_url, md_save_dir, html_save_dir, download_images, frontmatter_format
+            base_substack_url, md_save_dir, html_save_dir, download_images, frontmatter_format,
+            workers, session, use_api, incremental, stream_discovery, processes, queue_size, converter,
+            image_workers, image_policy, image_transcode, search_index, buffer_size,
         )
 
+    def get_url_html(self, url: str, max_attempts: int = 5) -> Optional[str]:
+        """Gets page HTML using requests, skipping paywalled posts."""
+        html = self.fetch_html_over_http(url, max_attempts)
+        if is_paywalled_html(html):
+            print(f"Skipping premium article: {url}")
+            return None
+        return html
+
     def get_url_soup(self, url: str, max_attempts: int = 5) -> Optional[BeautifulSoup]:
         """Gets soup from URL using requests, with retry on rate limiting."""
-        for attempt in range(1, max_attempts + 1):
-            try:
-                page = requests.get(url, headers=None)
-                soup = BeautifulSoup(page.content, "html.parser")
-
-                if soup.find("h2", class_="paywall-title"):
-                    print(f"Skipping premium article: {url}")
-                    return None
-
-                pre = soup.select_one("body > pre")
-                if pre and "too many requests" in pre.text.lower():
-                    if attempt == max_attempts:
-                        raise RuntimeError(f"Max attempts reached for URL: {url}. Too many requests.")
-                    base = 2 ** attempt
-                    delay = base + random.uniform(-0.2 * base, 0.2 * base)
-                    print(f"[{attempt}/{max_attempts}] Too many requests. Retrying in {delay:.2f} seconds...")
-                    sleep(delay)
-                    continue
-
-                return soup
-            except RuntimeError:
-                raise
-            except Exception as e:
-                raise ValueError(f"Error fetching page: {e}") from e
-
-        raise RuntimeError(f"Failed to fetch page after {max_attempts} attempts: {url}")
+        html = self.get_url_html(url, max_attempts)
+        return None if html is None else BeautifulSoup(html, "html.parser")
 
 
 # =============================================================================
@@ -1180,6 +3688,22 @@ class PremiumSubstackScraper(BaseSubstackScraper):
         use_persistent_profile: bool = False,
         skip_login: bool = False,
         frontmatter_format: str = "legacy",
+        workers: int = NUM_WORKERS,
+        session: Optional[requests.Session] = None,
+        incremental: bool = False,
+        stream_discovery: bool = False,
+        processes: int = 0,
+        queue_size: int = 0,
+        converter: str = DEFAULT_CONVERTER,
+        image_workers: int = IMAGE_WORKERS,
+        image_policy: Optional[ImagePolicy] = None,
+        image_transcode: Optional[ImageTranscode] = None,
+        search_index: bool = True,
+        buffer_size: int = WRITE_BUFFER_SIZE,
+        hybrid: bool = False,
+        cookie_jar: Optional[str] = None,
+        browsers: int = 1,
+        lean: bool = False,
     ) -> None:
         """
         Initialize the premium scraper with browser automation.
@@ -1195,7 +3719,28 @@ class PremiumSubstackScraper(BaseSubstackScraper):
             user_agent: Custom user agent string
             use_persistent_profile: Reuse browser profile across runs (saves login)
             skip_login: Skip login if using a pre-authenticated profile
+            workers: Number of posts to fetch ahead (raised to ``browsers`` if lower)
+            session: HTTP session for sitemap, image and driver downloads
+            incremental: Only fetch posts that are new or changed since the last sync
+            stream_discovery: Start scraping while the sitemap is still being read
+            processes: Worker processes for parsing and conversion (0 = main thread)
+            queue_size: Maximum posts fetched or being converted at once (0 = auto)
+            converter: HTML -> Markdown backend name (see MARKDOWN_CONVERTERS)
+            image_workers: Concurrent image downloads when download_images is set
+            image_policy: CDN variant (width, format, quality) to download images as
+            image_transcode: Resize and recompress downloaded images locally (needs Pillow)
+            search_index: Add scraped posts to the full-text search index
+            buffer_size: Read/write buffer size in bytes for downloads and output files
+            hybrid: Fetch posts over HTTP first and load only truncated (paywalled) ones in the browser
+            cookie_jar: File the login cookies are shared with the HTTP session through
+                (default: SESSION_COOKIE_JAR)
+            browsers: Browser instances loading pages in parallel; extra ones share the login cookies
+            lean: Load pages without images, fonts, media or trackers, returning at DOMContentLoaded
         """
+        workers = max(workers, browsers)
+        session = session or create_http_session(
+            pool_maxsize=max(HTTP_POOL_SIZE, workers), user_agent=user_agent or None
+        )
         # Initialize driver before calling super().__init__ since that fetches URLs
         self.driver = BrowserManager.create_driver(
             browser=browser,
@@ -1204,47 +3749,99 @@ class PremiumSubstackScraper(BaseSubstackScraper):
             browser_path=browser_path,
             user_agent=user_agent,
             use_persistent_profile=use_persistent_profile,
+            session=session,
+            lean=lean,
         )
         
         self.skip_login = skip_login
         self.use_persistent_profile = use_persistent_profile
+        self.hybrid = hybrid
+        # Posts fetched per path ("http" or "browser"), reported after scraping.
+        self.fetch_paths: Dict[str, int] = {"http": 0, "browser": 0}
+        self.fetch_paths_lock = threading.Lock()
+        self.session = session
+        self.cookie_jar = load_cookie_jar(cookie_jar or SESSION_COOKIE_JAR)
+        # Fetch threads export cookies after browser loads; the jar is rewritten only when they change.
+        self.cookie_lock = threading.Lock()
+        self.exported_cookies: frozenset = frozenset()
+        self.browser_cookies: List[dict] = []
+        for cookie in self.cookie_jar:
+            session.cookies.set_cookie(cookie)
         
-        if not skip_login:
-            self.login()
-        else:
+        if skip_login:
             print("Skipping login (using existing profile authentication)")
-            # Navigate to substack to verify we're logged in
+            # Load the publication so its cookies can be exported
             self.driver.get(base_substack_url)
-            sleep(3)
+        elif self.restore_session():
+            print("[OK] Saved session is still valid, skipping login")
+        else:
+            self.login()
+        self.export_session_cookies(self.driver)
+
+        # A WebDriver is not thread-safe, so each page load borrows a driver from the pool.
+        # Extra browsers can't share the (locked) persistent profile; they get the login cookies.
+        self.drivers = DriverPool(
+            lambda: BrowserManager.create_driver(
+                browser=browser,
+                headless=headless,
+                driver_path=driver_path,
+                browser_path=browser_path,
+                user_agent=user_agent,
+                session=session,
+                lean=lean,
+            ),
+            browsers,
+            base_substack_url,
+            lambda: self.browser_cookies,
+            first=self.driver,
+        )
 
         super().__init__(
-            base_substack_url, md_save_dir, html_save_dir, download_images, frontmatter_format
+            base_substack_url, md_save_dir, html_save_dir, download_images, frontmatter_format,
+            workers, session, incremental=incremental, stream_discovery=stream_discovery,
+            processes=processes, queue_size=queue_size, converter=converter,
+            image_workers=image_workers, image_policy=image_policy, image_transcode=image_transcode,
+            search_index=search_index, buffer_size=buffer_size,
         )
 
     def login(self) -> None:
-        """Log into Substack using Selenium."""
+        """Log into Substack using Selenium, waiting on the page rather than fixed delays."""
         print("Logging into Substack...")
-        self.driver.get("https://substack.com/sign-in")
-        sleep(3)
+        self.driver.get(SIGN_IN_URL)
+        wait = WebDriverWait(self.driver, LOGIN_FORM_TIMEOUT)
 
-        signin_with_password = self.driver.find_element(
-            By.XPATH, "//a[@class='login-option substack-login__login-option']"
-        )
+        signin_with_password = wait.until(EC.element_to_be_clickable(
+            (By.XPATH, "//a[@class='login-option substack-login__login-option']")
+        ))
         signin_with_password.click()
-        sleep(3)
 
-        email = self.driver.find_element(By.NAME, "email")
-        password = self.driver.find_element(By.NAME, "password")
+        email = wait.until(EC.visibility_of_element_located((By.NAME, "email")))
+        password = wait.until(EC.visibility_of_element_located((By.NAME, "password")))
         email.send_keys(EMAIL)
         password.send_keys(PASSWORD)
 
         submit = self.driver.find_element(By.XPATH, "//*[@id=\"substack-login\"]/div[2]/div[2]/form/button")
+        cookies_before = self.login_cookies()
         submit.click()
         
-        print("Waiting for login to complete (this may take up to 30 seconds)...")
-        sleep(30)
+        print(f"Waiting for login to complete (up to {LOGIN_TIMEOUT:.0f} seconds)...")
+        try:
+            # Done once Substack shows an error, redirects away from sign-in, or issues a new session cookie.
+            WebDriverWait(
+                self.driver, LOGIN_TIMEOUT, poll_frequency=0.25,
+                ignored_exceptions=(StaleElementReferenceException,),
+            ).until(
+                lambda d: self.is_login_failed()
+                or not self.on_sign_in_page()
+                or self.login_cookies() not in ({}, cookies_before)
+            )
+        except TimeoutException:
+            print(f"[WARN] No response to the login after {LOGIN_TIMEOUT:.0f} seconds")
 
-        if self.is_login_failed():
+        # Still on the sign-in page without a new session cookie: the wait timed out unanswered.
+        if self.is_login_failed() or (
+            self.on_sign_in_page() and self.login_cookies() in ({}, cookies_before)
+        ):
             raise Exception(
                 "Login unsuccessful. Please check your email and password, or your account status.\n"
                 "If you're seeing a CAPTCHA, try:\n"
@@ -1258,55 +3855,163 @@ class PremiumSubstackScraper(BaseSubstackScraper):
         if self.use_persistent_profile:
             print("[OK] Session saved to persistent profile")
 
+    def login_cookies(self) -> Dict[str, str]:
+        """The browser's Substack login cookies for the current page, by name."""
+        return {
+            cookie["name"]: cookie["value"]
+            for cookie in self.driver.get_cookies() if cookie["name"] in LOGIN_COOKIE_NAMES
+        }
+
+    def on_sign_in_page(self) -> bool:
+        return urlparse(self.driver.current_url).path.rstrip("/").endswith("/sign-in")
+
+    def restore_session(self) -> bool:
+        """Logs the browser in with the saved session, if there is one Substack still accepts.
+
+        The session comes from the cookie jar, or from the persistent profile
+        itself. Substack redirects signed-in readers away from the sign-in page,
+        so the session is valid if the browser leaves it before the form appears.
+        """
+        if not (has_login_cookie(self.cookie_jar) or self.use_persistent_profile):
+            return False
+        # Cookies can only be added for the domain the browser is on.
+        self.driver.get("https://substack.com/")
+        for cookie in self.cookie_jar:
+            if cookie.domain.lstrip(".").endswith("substack.com"):
+                try:
+                    self.driver.add_cookie(cookie_to_driver(cookie))
+                except WebDriverException:
+                    pass
+        self.driver.get(SIGN_IN_URL)
+        try:
+            WebDriverWait(self.driver, LOGIN_FORM_TIMEOUT, poll_frequency=0.25).until(
+                lambda d: not self.on_sign_in_page()
+                or d.find_elements(By.XPATH, "//a[@class='login-option substack-login__login-option']")
+            )
+        except TimeoutException:
+            return False
+        return not self.on_sign_in_page()
+
     def is_login_failed(self) -> bool:
         """Check for the presence of the 'error-container' to indicate a failed login."""
         error_container = self.driver.find_elements(By.ID, 'error-container')
         return len(error_container) > 0 and error_container[0].is_displayed()
 
-    def get_url_soup(self, url: str, max_attempts: int = 5) -> Optional[BeautifulSoup]:
-        """Gets soup from URL using logged-in Selenium driver, with retry on rate limiting."""
+    def export_session_cookies(self, driver: webdriver.Remote) -> int:
+        """Copies a browser's cookies into the HTTP session, the cookie jar and new pool drivers.
+
+        Only cookies for the page the driver is on are visible to it, so call
+        this after login or after loading the publication. Returns the number
+        of cookies copied, 0 when they are the same as last time.
+        """
+        now = time()
+        browser_cookies = [
+            cookie for cookie in driver.get_cookies() if cookie.get("expiry") is None or cookie["expiry"] > now
+        ]
+        exported = frozenset(
+            (cookie["name"], cookie["value"], cookie.get("domain", ""), cookie.get("path", "/"), cookie.get("expiry"))
+            for cookie in browser_cookies
+        )
+        with self.cookie_lock:
+            if exported == self.exported_cookies:
+                return 0
+            self.exported_cookies = exported
+            self.browser_cookies = browser_cookies
+            cookies = [cookie_from_driver(cookie) for cookie in browser_cookies]
+            for cookie in cookies:
+                self.session.cookies.set_cookie(cookie)
+                self.cookie_jar.set_cookie(cookie)
+            save_cookie_jar(self.cookie_jar)
+        if has_login_cookie(self.cookie_jar):
+            print(f"[OK] Exported {len(cookies)} browser cookies to the HTTP session")
+        return len(cookies)
+
+    def count_fetch(self, path: str) -> None:
+        with self.fetch_paths_lock:
+            self.fetch_paths[path] += 1
+
+    def get_url_html(self, url: str, max_attempts: int = 5) -> Optional[str]:
+        """Gets page HTML, over HTTP in hybrid mode unless the post comes back truncated."""
+        if self.hybrid:
+            html = self.fetch_html_over_http(url, max_attempts)
+            if not is_truncated_html(html):
+                self.count_fetch("http")
+                return html
+        # In hybrid mode the browser can read what HTTP couldn't: the exported session is stale.
+        html = self.get_url_html_from_driver(url, max_attempts, export_cookies=self.hybrid)
+        self.count_fetch("browser")
+        return html
+
+    def get_url_html_from_driver(
+        self, url: str, max_attempts: int = 5, export_cookies: bool = False
+    ) -> Optional[str]:
+        """Gets page HTML using logged-in Selenium driver, backing off through the rate limiter.
+
+        With ``export_cookies``, the cookies of the browser that loaded the post are exported.
+        """
         for attempt in range(1, max_attempts + 1):
             try:
-                self.driver.get(url)
-
-                # Wait up to 20s for the post body (or a paywall marker) to appear, instead of a fixed sleep.
-                try:
-                    WebDriverWait(self.driver, 20).until(
-                        lambda d: d.find_elements(By.CSS_SELECTOR, "div.available-content")
-                        or d.find_elements(By.CSS_SELECTOR, "h1.post-title")
-                        or d.find_elements(By.CSS_SELECTOR, "h2.paywall-title")
-                        or d.find_elements(By.CSS_SELECTOR, "body > pre")
-                    )
-                except TimeoutException:
-                    print(f"[WARN] Timeout waiting for post content to render: {url}")
-
-                soup = BeautifulSoup(self.driver.page_source, "html.parser")
-
-                pre = soup.select_one("body > pre")
-                if pre and "too many requests" in pre.text.lower():
-                    if attempt == max_attempts:
-                        raise RuntimeError(f"Max attempts reached for URL: {url}. Too many requests.")
-                    base = 2 ** attempt
-                    delay = base + random.uniform(-0.2 * base, 0.2 * base)
-                    print(f"[{attempt}/{max_attempts}] Too many requests. Retrying in {delay:.2f} seconds...")
-                    sleep(delay)
-                    continue
-
-                if soup.find("h2", class_="paywall-title"):
-                    print(f"Skipping premium article (no access): {url}")
-                    return None
-
-                return soup
-            except RuntimeError:
-                raise
+                self.rate_limiter.acquire(url)
+                with self.drivers.acquire() as driver:
+                    driver.get(url)
+
+                    # Wait up to 20s for the post body (or a paywall marker) to appear, instead of a fixed sleep.
+                    try:
+                        WebDriverWait(driver, 20).until(
+                            lambda d: d.find_elements(By.CSS_SELECTOR, "div.available-content")
+                            or d.find_elements(By.CSS_SELECTOR, "h1.post-title")
+                            or d.find_elements(By.CSS_SELECTOR, "h2.paywall-title")
+                            or d.find_elements(By.CSS_SELECTOR, "body > pre")
+                        )
+                    except TimeoutException:
+                        print(f"[WARN] Timeout waiting for post content to render: {url}")
+
+                    html = driver.page_source
+
+                    if is_rate_limited_html(html):
+                        self.rate_limiter.record_throttle(url)
+                        print(f"[{attempt}/{max_attempts}] Too many requests. Slowing down to "
+                              f"{self.rate_limiter.current_rate(url):.2f} requests/s...")
+                        continue
+                    self.rate_limiter.record_success(url)
+
+                    if is_paywalled_html(html):
+                        print(f"Skipping premium article (no access): {url}")
+                        return None
+
+                    if export_cookies:
+                        self.export_session_cookies(driver)
+
+                return html
+            except WebDriverException as e:
+                # A crashed browser has been replaced by the pool; retry on another one.
+                if attempt == max_attempts:
+                    raise ValueError(f"Error fetching page: {url}. Error: {e}") from e
+                print(f"[{attempt}/{max_attempts}] Browser error loading {url}, retrying: {e.msg}")
             except Exception as e:
                 raise ValueError(f"Error fetching page: {url}. Error: {e}") from e
 
-        raise RuntimeError(f"Failed to fetch page after {max_attempts} attempts: {url}")
+        raise RuntimeError(f"Max attempts reached for URL: {url}. Too many requests.")
+
+    def get_url_soup(self, url: str, max_attempts: int = 5) -> Optional[BeautifulSoup]:
+        """Gets soup from URL using logged-in Selenium driver, with retry on rate limiting."""
+        html = self.get_url_html(url, max_attempts)
+        return None if html is None else BeautifulSoup(html, "html.parser")
+
+    def scrape_posts(self, num_posts_to_scrape: int = 0) -> None:
+        """Scrapes posts as usual, then reports how many took the HTTP and the browser path."""
+        super().scrape_posts(num_posts_to_scrape)
+        if self.hybrid:
+            print(f"Hybrid fetch: {self.fetch_paths['http']} posts over HTTP, "
+                  f"{self.fetch_paths['browser']} through the browser")
+        if self.drivers.restarts:
+            print(f"Restarted {self.drivers.restarts} crashed browsers")
     
     def __del__(self):
-        """Clean up the driver when done."""
-        if hasattr(self, 'driver') and self.driver:
+        """Clean up the drivers when done."""
+        if hasattr(self, 'drivers'):
+            self.drivers.close()
+        elif hasattr(self, 'driver') and self.driver:
             try:
                 self.driver.quit()
             except Exception:
@@ -1334,9 +4039,19 @@ Examples:
   
   # Subsequent runs (skip login, use saved session)
   python substack_scraper.py --url https://example.substack.com --premium --persistent-profile --skip-login
+
+  # Load only paywalled posts in the browser
+  python substack_scraper.py --url https://example.substack.com --premium --hybrid
+
+  # Render premium posts in 4 browsers at once, skipping images, fonts and trackers
+  python substack_scraper.py --url https://example.substack.com --premium --browsers 4 --lean
   
   # Use manually downloaded driver
   python substack_scraper.py --url https://example.substack.com --premium --chrome-driver-path /path/to/chromedriver
+
+  # Search scraped posts, or rebuild the search index from the Markdown files
+  python substack_scraper.py search "central bank" --author example
+  python substack_scraper.py reindex
         """
     )
     
@@ -1356,6 +4071,87 @@ Examples:
         "-n", "--number", type=int, default=0,
         help="Number of posts to scrape (0 = all posts)."
     )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=NUM_WORKERS,
+        help="Number of posts to fetch concurrently (default: 1)."
+    )
+    parser.add_argument(
+        "--processes", type=int, default=0,
+        help="Worker processes for HTML parsing and Markdown/HTML conversion (default: 0, main thread)."
+    )
+    parser.add_argument(
+        "--queue-size", type=int, default=0,
+        help="Maximum posts fetched or being converted at once, bounding memory (default: auto)."
+    )
+    parser.add_argument(
+        "--image-workers", type=int, default=IMAGE_WORKERS,
+        help="Concurrent image downloads with --images (default: 4)."
+    )
+    parser.add_argument(
+        "--image-max-width", type=int, default=0,
+        help="With --images, download CDN variants at most this many pixels wide (default: original)."
+    )
+    parser.add_argument(
+        "--image-format", choices=IMAGE_VARIANT_FORMATS, default="",
+        help="With --images, download CDN variants in this format (default: original)."
+    )
+    parser.add_argument(
+        "--image-quality", type=int, default=0,
+        help="With --images, CDN compression quality from 1 to 100 (default: original)."
+    )
+    parser.add_argument(
+        "--optimize-images", action="store_true",
+        help="With --images, also save resized, recompressed WebP copies and thumbnails, and link to "
+             "those (needs Pillow)."
+    )
+    parser.add_argument(
+        "--optimize-width", type=int, default=ImageTranscode().max_width,
+        help="Maximum width of optimized image copies (default: 1600)."
+    )
+    parser.add_argument(
+        "--thumbnail-width", type=int, default=ImageTranscode().thumbnail_width,
+        help="Width of image thumbnails (default: 320)."
+    )
+    parser.add_argument(
+        "--buffer-size", type=int, default=WRITE_BUFFER_SIZE // 1024,
+        help="Read/write buffer size for downloads and output files, in KB (default: 256)."
+    )
+    parser.add_argument(
+        "--verify", action="store_true",
+        help="Before scraping, re-fetch truncated or corrupt images and posts left by interrupted runs."
+    )
+    parser.add_argument(
+        "--no-search-index", action="store_true",
+        help="Don't add scraped posts to the full-text search index (see the 'search' command)."
+    )
+    parser.add_argument(
+        "--converter", choices=list(MARKDOWN_CONVERTERS), default=DEFAULT_CONVERTER,
+        help="HTML to Markdown backend (default: html2text). Compare them with benchmarks/converters.py."
+    )
+    parser.add_argument(
+        "--pool-size", type=int, default=HTTP_POOL_SIZE,
+        help="Maximum open HTTP connections per host (default: 10)."
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=HTTP_TIMEOUT,
+        help="Default HTTP request timeout in seconds (default: 30)."
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, default=RATE_LIMIT_INITIAL,
+        help="Initial requests per second per host; adapts to throttling (default: 4)."
+    )
+    parser.add_argument(
+        "--api", action="store_true",
+        help="Fetch free posts from Substack's JSON API, falling back to the HTML page per post."
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only fetch posts that are new or whose sitemap lastmod changed since the last run."
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Start scraping posts while the sitemap is still being discovered."
+    )
     parser.add_argument(
         "--images",
         action="store_true",
@@ -1390,6 +4186,18 @@ Examples:
         "--skip-login", action="store_true",
         help="Skip login (use with --persistent-profile after first login)."
     )
+    premium_group.add_argument(
+        "--browsers", type=int, default=1,
+        help="Browser instances loading pages in parallel (default: 1). Raises --workers to match."
+    )
+    premium_group.add_argument(
+        "--lean", action="store_true",
+        help="Skip images, fonts, media and third-party scripts when loading pages in the browser."
+    )
+    premium_group.add_argument(
+        "--hybrid", action="store_true",
+        help="Fetch posts over HTTP first and use the browser only for paywalled ones."
+    )
     
     # Driver path options
     driver_group = parser.add_argument_group('Driver options (for troubleshooting)')
@@ -1418,7 +4226,11 @@ Examples:
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ("search", "reindex"):
+        search_main(sys.argv[1:])
+        return
     args = parse_args()
+    buffer_size = max(1, args.buffer_size) * 1024
 
     if args.directory is None:
         args.directory = BASE_MD_DIR
@@ -1434,6 +4246,17 @@ def main():
         driver_path = args.edge_driver_path
         browser_path = args.edge_path
 
+    session = create_http_session(
+        pool_maxsize=max(args.pool_size, args.workers, args.image_workers),
+        timeout=args.timeout,
+        user_agent=args.user_agent or None,
+        rate_limiter=RateLimiter(rate=args.rate_limit),
+    )
+    image_policy = ImagePolicy(args.image_max_width, args.image_format, args.image_quality)
+    image_transcode = (
+        ImageTranscode(args.optimize_width, args.thumbnail_width) if args.optimize_images else None
+    )
+
     if args.url:
         if args.premium:
             scraper = PremiumSubstackScraper(
@@ -1449,6 +4272,21 @@ def main():
                 use_persistent_profile=args.persistent_profile,
                 skip_login=args.skip_login,
                 frontmatter_format=args.frontmatter,
+                workers=args.workers,
+                session=session,
+                incremental=args.incremental,
+                stream_discovery=args.stream,
+                processes=args.processes,
+                queue_size=args.queue_size,
+                converter=args.converter,
+                image_workers=args.image_workers,
+                image_policy=image_policy,
+                image_transcode=image_transcode,
+                search_index=not args.no_search_index,
+                buffer_size=buffer_size,
+                hybrid=args.hybrid,
+                browsers=args.browsers,
+                lean=args.lean,
             )
         else:
             scraper = SubstackScraper(
@@ -1457,7 +4295,22 @@ def main():
                 html_save_dir=args.html_directory,
                 download_images=args.images,
                 frontmatter_format=args.frontmatter,
+                workers=args.workers,
+                session=session,
+                incremental=args.incremental,
+                stream_discovery=args.stream,
+                processes=args.processes,
+                queue_size=args.queue_size,
+                converter=args.converter,
+                image_workers=args.image_workers,
+                image_policy=image_policy,
+                image_transcode=image_transcode,
+                search_index=not args.no_search_index,
+                buffer_size=buffer_size,
+                use_api=args.api,
             )
+        if args.verify:
+            scraper.verify_outputs()
         scraper.scrape_posts(args.number)
 
     else:
@@ -1476,6 +4329,21 @@ def main():
                 use_persistent_profile=args.persistent_profile,
                 skip_login=args.skip_login,
                 frontmatter_format=args.frontmatter,
+                workers=args.workers,
+                session=session,
+                incremental=args.incremental,
+                stream_discovery=args.stream,
+                processes=args.processes,
+                queue_size=args.queue_size,
+                converter=args.converter,
+                image_workers=args.image_workers,
+                image_policy=image_policy,
+                image_transcode=image_transcode,
+                search_index=not args.no_search_index,
+                buffer_size=buffer_size,
+                hybrid=args.hybrid,
+                browsers=args.browsers,
+                lean=args.lean,
             )
         else:
             scraper = SubstackScraper(
@@ -1484,7 +4352,22 @@ def main():
                 html_save_dir=args.html_directory,
                 download_images=args.images,
                 frontmatter_format=args.frontmatter,
+                workers=args.workers,
+                session=session,
+                incremental=args.incremental,
+                stream_discovery=args.stream,
+                processes=args.processes,
+                queue_size=args.queue_size,
+                converter=args.converter,
+                image_workers=args.image_workers,
+                image_policy=image_policy,
+                image_transcode=image_transcode,
+                search_index=not args.no_search_index,
+                buffer_size=buffer_size,
+                use_api=args.api,
             )
+        if args.verify:
+            scraper.verify_outputs()
         scraper.scrape_posts(num_posts_to_scrape=NUM_POSTS_TO_SCRAPE)
 
 
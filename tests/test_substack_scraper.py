@@ -1,10 +1,13 @@
 import os
 import sys
+import re
 import shutil
+import hashlib
 
 import pytest
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
+from urllib.parse import urlparse
 
 import substack_scraper as ss
 
@@ -227,4 +230,1639 @@ def test_scraper_initialization(tmp_path):
 
     assert scraper.writer_name == "example"
     assert os.path.isdir(os.path.join(md_dir, "example"))
-    assert os.path.isdir(os.path.join(html_dir, "example"))
\ No newline at end of file
+    assert os.path.isdir(os.path.join(html_dir, "example"))
+
+# ---------------------------------------------------------------------------
+# Concurrent fetching
+# ---------------------------------------------------------------------------
+
+
+POST_HTML = """
+<html><body>
+<h1 class="post-title">{title}</h1>
+<div class="available-content"><p>Body of {title}</p></div>
+</body></html>
+"""
+
+
+class PageScraper(ss.BaseSubstackScraper):
+    """Serves canned post pages; later URLs respond faster to shuffle completion order."""
+
+    def get_url_soup(self, url: str):
+        import time
+        from bs4 import BeautifulSoup
+
+        index = self.post_urls.index(url)
+        time.sleep(0.01 * (len(self.post_urls) - index))
+        return BeautifulSoup(POST_HTML.format(title=f"Post {index}"), "html.parser")
+
+
+@pytest.fixture
+def output_dirs(tmp_path, monkeypatch):
+    """Redirects the JSON data, author page and image output into ``tmp_path``."""
+    template = tmp_path / "author_template.html"
+    template.write_text(Path(ss.HTML_TEMPLATE).read_text(encoding="utf-8"), encoding="utf-8")
+    monkeypatch.setattr(ss, "JSON_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(ss, "BASE_HTML_DIR", str(tmp_path / "html"))
+    monkeypatch.setattr(ss, "HTML_TEMPLATE", str(template))
+    monkeypatch.setattr(ss, "BASE_IMAGE_DIR", str(tmp_path / "images"))
+    return tmp_path
+
+
+def make_page_scraper(tmp_path, num_posts: int, workers: int) -> PageScraper:
+    scraper = PageScraper(
+        "https://example.substack.com/p/post-0",
+        str(tmp_path / "md"),
+        str(tmp_path / "html"),
+        workers=workers,
+    )
+    scraper.post_urls = [f"https://example.substack.com/p/post-{i}" for i in range(num_posts)]
+    return scraper
+
+
+def read_essay_titles(tmp_path, author="example"):
+    import json
+
+    with open(tmp_path / "data" / f"{author}.json", encoding="utf-8") as f:
+        return [essay["title"] for essay in json.load(f)]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_scrape_posts_keeps_url_order(output_dirs, workers):
+    scraper = make_page_scraper(output_dirs, num_posts=6, workers=workers)
+
+    scraper.scrape_posts()
+
+    assert read_essay_titles(output_dirs) == [f"Post {i}" for i in range(6)]
+
+
+def test_scrape_posts_respects_limit_with_workers(output_dirs):
+    scraper = make_page_scraper(output_dirs, num_posts=10, workers=4)
+
+    scraper.scrape_posts(num_posts_to_scrape=3)
+
+    assert read_essay_titles(output_dirs) == ["Post 0", "Post 1", "Post 2"]
+    assert sorted(os.listdir(output_dirs / "md" / "example")) == [
+        "post-0.md", "post-1.md", "post-2.md"
+    ]
+
+
+def test_scrape_posts_limit_fetches_no_extra_posts(output_dirs):
+    class SkippingScraper(PageScraper):
+        def get_url_soup(self, url):
+            fetched.append(url)
+            # Post 1 is unavailable, so it doesn't count towards the limit.
+            return None if url.endswith("/post-1") else super().get_url_soup(url)
+
+    fetched = []
+    scraper = SkippingScraper(
+        "https://example.substack.com/p/post-0", str(output_dirs / "md"), str(output_dirs / "html"), workers=4
+    )
+    scraper.post_urls = [f"https://example.substack.com/p/post-{i}" for i in range(10)]
+
+    scraper.scrape_posts(num_posts_to_scrape=3)
+
+    assert read_essay_titles(output_dirs) == ["Post 0", "Post 2", "Post 3"]
+    assert sorted(fetched) == [f"https://example.substack.com/p/post-{i}" for i in range(4)]
+
+
+def test_workers_must_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        DummyScraper(
+            "https://example.substack.com/p/my-post",
+            str(tmp_path / "md"),
+            str(tmp_path / "html"),
+            workers=0,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Pooled HTTP session
+# ---------------------------------------------------------------------------
+
+
+def test_create_http_session_configures_pool_and_encoding():
+    session = ss.create_http_session(pool_connections=3, pool_maxsize=7, timeout=5)
+
+    adapter = session.get_adapter("https://example.substack.com/")
+    assert isinstance(adapter, ss.TimeoutHTTPAdapter)
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 7
+    assert adapter.timeout == 5
+    assert "gzip" in session.headers["Accept-Encoding"]
+
+
+@patch("requests.adapters.HTTPAdapter.send")
+def test_session_applies_default_timeout(mock_send):
+    response = ss.requests.Response()
+    response.status_code = 200
+    mock_send.return_value = response
+    session = ss.create_http_session(timeout=12)
+
+    session.get("https://example.com/")
+    assert mock_send.call_args.kwargs["timeout"] == 12
+
+    session.get("https://example.com/", timeout=3)
+    assert mock_send.call_args.kwargs["timeout"] == 3
+
+
+def test_scraper_reuses_given_session(tmp_path):
+    session = ss.create_http_session()
+
+    scraper = DummyScraper(
+        "https://example.substack.com/p/my-post",
+        str(tmp_path / "md"),
+        str(tmp_path / "html"),
+        session=session,
+    )
+
+    assert scraper.session is session
+
+
+# ---------------------------------------------------------------------------
+# Adaptive rate limiting
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [(None, None), ("", None), ("7", 7.0), ("not a date", None)],
+)
+def test_parse_retry_after(header, expected):
+    assert ss.parse_retry_after(header) == expected
+
+
+def test_parse_retry_after_http_date():
+    from email.utils import format_datetime
+    from datetime import datetime, timedelta, timezone
+
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert 25 < ss.parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+def test_rate_limiter_backs_off_and_recovers():
+    limiter = ss.RateLimiter(rate=4, min_rate=0.5, max_rate=8, increase=0.5)
+    url = "https://example.substack.com/p/post"
+
+    limiter.record_throttle(url)
+    limiter.record_throttle(url)
+    assert limiter.current_rate(url) == 1.0
+    assert limiter.throttle_events == 2
+
+    for _ in range(3):
+        limiter.record_success(url)
+    assert limiter.current_rate(url) == 2.5
+
+    # Other hosts keep their own bucket.
+    assert limiter.current_rate("https://substackcdn.com/image.png") == 4
+    assert limiter.metrics()["example.substack.com"]["throttle_events"] == 2
+
+
+def test_token_bucket_honours_retry_after():
+    bucket = ss.TokenBucket(rate=10, min_rate=1, max_rate=20, increase=1)
+
+    bucket.on_throttle(now=100.0, retry_after=5)
+
+    assert bucket.rate == 5
+    assert bucket.reserve(now=101.0) == pytest.approx(4.0)
+    assert bucket.reserve(now=105.0) > 0  # the bucket restarts empty
+    assert bucket.reserve(now=105.2) == 0
+
+
+@patch("requests.adapters.HTTPAdapter.send")
+def test_session_records_429_throttles(mock_send):
+    throttled = ss.requests.Response()
+    throttled.status_code = 429
+    throttled.headers["Retry-After"] = "0"
+    mock_send.return_value = throttled
+    limiter = ss.RateLimiter(rate=50)
+    session = ss.create_http_session(rate_limiter=limiter)
+
+    session.get("https://example.substack.com/p/post")
+
+    assert session.rate_limiter is limiter
+    assert limiter.throttle_events == 1
+    assert limiter.current_rate("https://example.substack.com/") == 25
+
+
+@pytest.mark.parametrize("status, headers, throttles, rate", [
+    (503, {"Retry-After": "0"}, 3, 6.25),
+    (500, {}, 0, 50),
+    (503, {}, 0, 50),
+])
+@patch("requests.adapters.HTTPAdapter.send")
+def test_session_does_not_speed_up_on_server_errors(mock_send, status, headers, throttles, rate):
+    failed = ss.requests.Response()
+    failed.status_code = status
+    failed.headers.update(headers)
+    mock_send.return_value = failed
+    limiter = ss.RateLimiter(rate=50, max_rate=100)
+    session = ss.create_http_session(rate_limiter=limiter)
+
+    for _ in range(3):
+        session.get("https://example.substack.com/p/post")
+
+    assert limiter.throttle_events == throttles
+    assert limiter.current_rate("https://example.substack.com/") == rate
+
+
+def test_free_scraper_backs_off_on_too_many_requests_page(tmp_path):
+    scraper = ss.SubstackScraper(
+        "https://example.substack.com/p/post",
+        str(tmp_path / "md"),
+        str(tmp_path / "html"),
+    )
+    headers = {"content-type": "text/html; charset=utf-8"}
+    too_many = Mock(status_code=200, headers=headers, encoding="utf-8",
+                    content=b"<html><body><pre>Too Many Requests</pre></body></html>")
+    ok = Mock(status_code=200, headers=headers, encoding="utf-8",
+              content=POST_HTML.format(title="Hello").encode())
+    scraper.session = Mock(get=Mock(side_effect=[too_many, ok]))
+    scraper.rate_limiter = ss.RateLimiter(rate=4)
+
+    soup = scraper.get_url_soup("https://example.substack.com/p/post")
+
+    assert soup.select_one("h1.post-title").text == "Hello"
+    assert scraper.rate_limiter.throttle_events == 1
+
+
+# ---------------------------------------------------------------------------
+# JSON API fast path (against a local stand-in server)
+# ---------------------------------------------------------------------------
+
+
+class StandInSubstack:
+    """Minimal local stand-in for a Substack publication, keyed by request path."""
+
+    def __init__(self):
+        import json
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.routes = {}
+        self.requests = []
+        self.ranges = []
+        # Statuses to answer a path with before serving its route, one per request.
+        self.failures = {}
+        # Where to start a path's ranged responses, whatever range was asked for.
+        self.range_starts = {}
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.requests.append(self.path)
+                failures = stand_in.failures.get(self.path)
+                if failures:
+                    self.send_response(failures.pop(0))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                route = stand_in.routes.get(self.path)
+                if route is None:
+                    route = stand_in.routes.get(self.path.split("?")[0])
+                if route is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                content_type, body = route
+                if not isinstance(body, (str, bytes)):
+                    body = json.dumps(body)
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                byte_range = self.headers.get("Range")
+                if byte_range:
+                    start = int(byte_range.split("=")[1].rstrip("-"))
+                    stand_in.ranges.append(start)
+                    if start >= len(body):
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{len(body)}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    start = stand_in.range_starts.get(self.path, start)
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+                    body = body[start:]
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.thread.start()
+
+    def add(self, path, body, content_type="application/json"):
+        self.routes[path] = (content_type, body)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    server = StandInSubstack()
+    yield server
+    server.close()
+
+
+def fast_session():
+    return ss.create_http_session(rate_limiter=ss.RateLimiter(rate=1000, max_rate=1000))
+
+
+def api_post(slug, title, **extra):
+    post = {
+        "slug": slug,
+        "canonical_url": f"https://example.substack.com/p/{slug}",
+        "title": title,
+        "subtitle": "A subtitle",
+        "post_date": "2024-03-05T10:00:00.000Z",
+        "publishedBylines": [{"name": "Jane Writer"}],
+        "cover_image": "https://substackcdn.com/image/cover.png",
+        "reaction_count": 42,
+        "audience": "everyone",
+        "body_html": f"<p>Body of {title}</p>",
+    }
+    post.update(extra)
+    return post
+
+
+def test_api_mode_extracts_post_from_json(stand_in, tmp_path):
+    stand_in.add("/api/v1/posts/hello", api_post("hello", "Hello API"))
+    scraper = ss.SubstackScraper(
+        f"{stand_in.url}p/hello", str(tmp_path / "md"), str(tmp_path / "html"),
+        session=fast_session(), use_api=True,
+    )
+
+    post = scraper.fetch_post(f"{stand_in.url}p/hello")
+    extracted = scraper.extract_post(post, "")
+
+    assert isinstance(post, dict)
+    assert extracted[:6] == (
+        "Hello API", "A subtitle", "Jane Writer", "2024-03-05",
+        "https://substackcdn.com/image/cover.png", "42",
+    )
+    assert "Body of Hello API" in extracted.md_content
+    assert extracted.content_present
+    assert not any(path.startswith("/p/") for path in stand_in.requests)
+
+
+@pytest.mark.parametrize("api_body", [None, api_post("hello", "Paid", audience="only_paid")])
+def test_api_mode_falls_back_to_html(stand_in, tmp_path, api_body):
+    if api_body is not None:
+        stand_in.add("/api/v1/posts/hello", api_body)
+    stand_in.add("/p/hello", POST_HTML.format(title="From HTML"), "text/html")
+    scraper = ss.SubstackScraper(
+        f"{stand_in.url}p/hello", str(tmp_path / "md"), str(tmp_path / "html"),
+        session=fast_session(), use_api=True,
+    )
+
+    post = scraper.fetch_post(f"{stand_in.url}p/hello")
+
+    assert isinstance(post, str)
+    assert scraper.extract_post(post, f"{stand_in.url}p/hello").title == "From HTML"
+
+
+def test_api_mode_discovers_posts_from_archive(stand_in, tmp_path, output_dirs, monkeypatch):
+    monkeypatch.setattr(ss, "API_ARCHIVE_PAGE_SIZE", 2)
+    posts = [api_post(f"post-{i}", f"Post {i}") for i in range(3)]
+    for post in posts:
+        post["canonical_url"] = f"{stand_in.url}p/{post['slug']}"
+        stand_in.add(f"/api/v1/posts/{post['slug']}", post)
+    stand_in.add("/api/v1/archive?sort=new&offset=0&limit=2", posts[:2])
+    stand_in.add("/api/v1/archive?sort=new&offset=2&limit=2", posts[2:])
+
+    scraper = ss.SubstackScraper(
+        stand_in.url, str(tmp_path / "md"), str(tmp_path / "html"),
+        session=fast_session(), use_api=True,
+    )
+    scraper.scrape_posts()
+
+    assert scraper.post_urls == [post["canonical_url"] for post in posts]
+    assert sorted(os.listdir(tmp_path / "md" / "127")) == ["post-0.md", "post-1.md", "post-2.md"]
+    assert not any("sitemap" in path for path in stand_in.requests)
+
+
+def test_archive_discovery_pages_concurrently_when_sitemap_missing(stand_in, tmp_path, monkeypatch):
+    monkeypatch.setattr(ss, "API_ARCHIVE_PAGE_SIZE", 2)
+    posts = [
+        api_post(f"post-{i}", f"Post {i}", post_date=f"2024-01-0{i + 1}T00:00:00Z")
+        for i in range(5)
+    ]
+    posts[4]["updated_at"] = "2024-02-01T00:00:00Z"
+    pages = [posts[0:2], [posts[1], posts[2]], [posts[3], posts[4]], [posts[4]]]
+    for number, page in enumerate(pages):
+        stand_in.add(f"/api/v1/archive?sort=new&offset={number * 2}&limit=2", page)
+
+    scraper = ss.SubstackScraper(
+        stand_in.url, str(tmp_path / "md"), str(tmp_path / "html"),
+        session=fast_session(), workers=3,
+    )
+
+    assert scraper.post_urls == [post["canonical_url"] for post in posts]
+    assert scraper.post_lastmod[posts[0]["canonical_url"]] == "2024-01-01T00:00:00Z"
+    assert scraper.post_lastmod[posts[4]["canonical_url"]] == "2024-02-01T00:00:00Z"
+    assert not any("feed.xml" in path for path in stand_in.requests)
+    assert not any("offset=12" in path for path in stand_in.requests)
+
+
+def test_archive_discovery_retries_throttled_page(stand_in, tmp_path, monkeypatch):
+    monkeypatch.setattr(ss, "API_ARCHIVE_PAGE_SIZE", 2)
+    posts = [api_post(f"post-{i}", f"Post {i}") for i in range(7)]
+    for number in range(4):
+        stand_in.add(f"/api/v1/archive?sort=new&offset={number * 2}&limit=2", posts[number * 2:number * 2 + 2])
+    stand_in.failures["/api/v1/archive?sort=new&offset=2&limit=2"] = [429]
+
+    scraper = ss.SubstackScraper(
+        stand_in.url, str(tmp_path / "md"), str(tmp_path / "html"),
+        session=fast_session(), workers=2,
+    )
+
+    assert scraper.post_urls == [post["canonical_url"] for post in posts]
+    assert stand_in.requests.count("/api/v1/archive?sort=new&offset=2&limit=2") == 2
+    assert scraper.rate_limiter.throttle_events == 1
+
+
+# ---------------------------------------------------------------------------
+# Incremental sync
+# ---------------------------------------------------------------------------
+
+
+def sitemap_xml(entries):
+    urls = "".join(
+        f"<url><loc>{loc}</loc><lastmod>{lastmod}</lastmod></url>" for loc, lastmod in entries
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+    )
+
+
+def test_sync_manifest_needs_fetch(tmp_path):
+    manifest = ss.SyncManifest(str(tmp_path / "example.sync.json"))
+    manifest.record("https://x/p/a", "2024-01-01", "hash", "a.md", "a.html")
+    manifest.save()
+
+    reloaded = ss.SyncManifest(str(tmp_path / "example.sync.json"))
+
+    assert reloaded.needs_fetch("https://x/p/new", "2024-01-01")
+    assert not reloaded.needs_fetch("https://x/p/a", "2024-01-01")
+    assert not reloaded.needs_fetch("https://x/p/a", None)
+    assert reloaded.needs_fetch("https://x/p/a", "2024-02-01")
+    assert reloaded.content_hash("https://x/p/a") == "hash"
+
+
+def test_incremental_run_fetches_only_new_or_changed_posts(stand_in, tmp_path, output_dirs):
+    post_urls = [f"{stand_in.url}p/post-{i}" for i in range(3)]
+    for i in range(3):
+        stand_in.add(f"/p/post-{i}", POST_HTML.format(title=f"Post {i}"), "text/html")
+    stand_in.add("/sitemap.xml", sitemap_xml([(url, "2024-01-01") for url in post_urls]), "application/xml")
+
+    def run():
+        stand_in.requests.clear()
+        scraper = ss.SubstackScraper(
+            stand_in.url, str(tmp_path / "md"), str(tmp_path / "html"),
+            session=fast_session(), incremental=True,
+        )
+        scraper.scrape_posts()
+        return [path for path in stand_in.requests if path.startswith("/p/")]
+
+    assert run() == ["/p/post-0", "/p/post-1", "/p/post-2"]
+    assert run() == []
+
+    stand_in.add("/p/post-1", POST_HTML.format(title="Post 1 (edited)"), "text/html")
+    stand_in.add(
+        "/sitemap.xml",
+        sitemap_xml([(url, "2024-03-01" if url.endswith("post-1") else "2024-01-01") for url in post_urls]),
+        "application/xml",
+    )
+    assert run() == ["/p/post-1"]
+    assert "Post 1 (edited)" in (tmp_path / "md" / "127" / "post-1.md").read_text(encoding="utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Streaming sitemap discovery
+# ---------------------------------------------------------------------------
+
+
+def sitemap_index_xml(locs):
+    children = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{children}</sitemapindex>'
+    )
+
+
+@pytest.fixture
+def sitemap_index(stand_in):
+    """A sitemap index with two child sitemaps, one of them repeating a post."""
+    posts = [f"{stand_in.url}p/post-{i}" for i in range(4)]
+    stand_in.add("/sitemap.xml", sitemap_index_xml(
+        [f"{stand_in.url}sitemap-1.xml", f"{stand_in.url}sitemap-2.xml"]
+    ), "application/xml")
+    stand_in.add("/sitemap-1.xml", sitemap_xml(
+        [(posts[0], "2024-01-01"), (f"{stand_in.url}about", "2024-01-01"), (posts[1], "2024-01-02")]
+    ), "application/xml")
+    stand_in.add("/sitemap-2.xml", sitemap_xml(
+        [(posts[2], "2024-01-03"), (posts[3], "2024-01-04"), (posts[1], "2024-01-02")]
+    ), "application/xml")
+    for i in range(4):
+        stand_in.add(f"/p/post-{i}", POST_HTML.format(title=f"Post {i}"), "text/html")
+    return posts
+
+
+def test_sitemap_index_children_are_followed(stand_in, sitemap_index, tmp_path):
+    scraper = ss.SubstackScraper(
+        stand_in.url, str(tmp_path / "md"), str(tmp_path / "html"),
+        session=fast_session(), workers=2,
+    )
+
+    assert sorted(scraper.post_urls) == sitemap_index
+    assert scraper.post_lastmod[sitemap_index[3]] == "2024-01-04"
+
+
+def test_stream_discovery_scrapes_while_discovering(stand_in, sitemap_index, tmp_path, output_dirs):
+    scraper = ss.SubstackScraper(
+        stand_in.url, str(tmp_path / "md"), str(tmp_path / "html"),
+        session=fast_session(), workers=2, stream_discovery=True,
+    )
+    assert scraper.post_urls == []
+
+    scraper.scrape_posts()
+
+    assert sorted(scraper.post_urls) == sitemap_index
+    assert sorted(os.listdir(tmp_path / "md" / "127")) == [f"post-{i}.md" for i in range(4)]
+
+
+# ---------------------------------------------------------------------------
+# Fetch / process-pool pipeline
+# ---------------------------------------------------------------------------
+
+
+def test_post_extractor_is_picklable_and_renders_html(html_parser):
+    import pickle
+
+    extractor = pickle.loads(pickle.dumps(ss.PostExtractor()))
+
+    extracted = extractor(POST_HTML.format(title="Pickled"), "https://example.substack.com/p/x")
+
+    assert extracted.title == "Pickled"
+    assert extracted.content_present
+    assert "<p>Body of Pickled</p>" in extracted.html_content
+
+
+@pytest.mark.parametrize("html, expected", [
+    ('<h2 class="paywall-title">This post is for paid subscribers</h2>', True),
+    ('<h2 class="header-anchor-post paywall-title">x</h2>', True),
+    ('<h2 class="post-title">Free</h2><p>paywall-title</p>', False),
+])
+def test_is_paywalled_html(html, expected):
+    assert ss.is_paywalled_html(html) is expected
+
+
+def test_is_rate_limited_html():
+    assert ss.is_rate_limited_html("<html><body><pre>Too Many Requests</pre></body></html>")
+    assert not ss.is_rate_limited_html("<p>An essay about too many requests</p>")
+
+
+def test_scrape_posts_with_process_pool(stand_in, tmp_path, output_dirs):
+    for i in range(5):
+        stand_in.add(f"/p/post-{i}", POST_HTML.format(title=f"Post {i}"), "text/html; charset=utf-8")
+    scraper = ss.SubstackScraper(
+        f"{stand_in.url}p/post-0", str(tmp_path / "md"), str(tmp_path / "html"),
+        session=fast_session(), workers=3, processes=2, queue_size=3,
+    )
+    scraper.post_urls = [f"{stand_in.url}p/post-{i}" for i in range(5)]
+
+    scraper.scrape_posts(num_posts_to_scrape=4)
+
+    assert read_essay_titles(tmp_path, author="127") == [f"Post {i}" for i in range(4)]
+    html = (tmp_path / "html" / "127" / "post-3.html").read_text(encoding="utf-8")
+    assert "<p>Body of Post 3</p>" in html
+
+
+# ---------------------------------------------------------------------------
+# Restricted single-pass extraction
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(params=["html.parser", "lxml"])
+def html_parser(request, monkeypatch):
+    """Runs a test with each HTML parser extraction may use; lxml only when installed."""
+    if request.param == "lxml":
+        pytest.importorskip("lxml")
+    monkeypatch.setattr(ss, "HTML_PARSER", request.param)
+    return request.param
+
+
+FULL_POST_HTML = """
+<html><head>
+<script type="application/ld+json">
+{"datePublished": "2024-02-03T08:00:00Z", "author": [{"name": "Jane Writer"}],
+ "image": [{"url": "https://substackcdn.com/cover.png"}]}
+</script>
+<script>window.analytics = {};</script>
+</head><body>
+<nav><h2>Navigation heading</h2></nav>
+<article>
+<h1 class="post-title">Real Title</h1>
+<h3 class="subtitle">Real Subtitle</h3>
+<div class="like-button-container"><button><div class="label">17</div></button></div>
+<div class="available-content"><h2>Section</h2><p>Paragraph <a href="https://x.com">link</a></p></div>
+</article>
+<footer><div class="comments">Lots of comments</div></footer>
+</body></html>
+"""
+
+
+def test_parse_post_html_keeps_only_post_parts(html_parser):
+    soup = ss.parse_post_html(FULL_POST_HTML)
+
+    if ss.POST_PARTS_STRAINER is not None:
+        assert soup.find("footer") is None
+        assert soup.find("nav") is None
+    assert soup.select_one("div.available-content p") is not None
+
+
+def test_restricted_extraction_matches_full_parse(tmp_path, html_parser):
+    from bs4 import BeautifulSoup
+
+    extractor = ss.PostExtractor(debug_dir=str(tmp_path))
+    restricted = extractor(FULL_POST_HTML, "https://example.substack.com/p/real")
+    full = extractor.from_soup(BeautifulSoup(FULL_POST_HTML, html_parser), "https://example.substack.com/p/real")
+
+    # The first h2 (in the nav) precedes the post title, exactly as with the old CSS selector.
+    assert restricted == full
+    assert restricted[1:6] == (
+        "Real Subtitle", "Jane Writer", "2024-02-03", "https://substackcdn.com/cover.png", "17"
+    )
+    assert restricted.content_present
+
+
+def test_find_post_parts_skips_inside_matched_parts():
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(
+        '<div class="available-content"><h2>Inner</h2></div><h1 class="post-title">Title</h1>'
+        '<h2 class="paywall-title">Paid</h2>',
+        "html.parser",
+    )
+
+    parts = ss.find_post_parts(soup)
+
+    assert parts["title"].text == "Title"
+    assert parts["paywall"].text == "Paid"
+    assert parts["content"].name == "div"
+
+
+# ---------------------------------------------------------------------------
+# Markdown conversion engine
+# ---------------------------------------------------------------------------
+
+
+def test_get_converter_reuses_instance_per_thread():
+    import threading
+
+    first = ss.get_converter()
+    other = []
+    thread = threading.Thread(target=lambda: other.append(ss.get_converter()))
+    thread.start()
+    thread.join()
+
+    assert ss.get_converter() is first
+    assert other[0] is not first
+    assert ss.get_markdown_renderer() is ss.get_markdown_renderer()
+
+
+def test_repeated_conversions_do_not_leak_state():
+    first_md = ss.BaseSubstackScraper.html_to_md("<p>one <a href='https://x.com'>link</a></p>")
+    second_md = ss.BaseSubstackScraper.html_to_md("<p>two</p>")
+    assert first_md.strip() == "one [link](https://x.com)"
+    assert second_md.strip() == "two"
+
+    ss.BaseSubstackScraper.md_to_html("Text[^1]\n\n[^1]: A footnote")
+    assert ss.BaseSubstackScraper.md_to_html("plain") == "<p>plain</p>"
+
+
+def test_registered_converter_is_used_by_extractor(monkeypatch):
+    class ShoutingConverter(ss.MarkdownConverter):
+        def convert(self, html_content):
+            return "SHOUT"
+
+    monkeypatch.setitem(ss.MARKDOWN_CONVERTERS, "shout", ShoutingConverter)
+
+    extracted = ss.PostExtractor(converter="shout")(
+        POST_HTML.format(title="Loud"), "https://example.substack.com/p/x"
+    )
+
+    assert extracted.md_content.endswith("SHOUT")
+    with pytest.raises(ValueError):
+        ss.PostExtractor(converter="missing")
+
+
+def test_benchmark_converters_reports_throughput():
+    results = ss.benchmark_converters(["<p>a</p>", "<h1>b</h1>"], ["html2text"], repeat=1)
+
+    assert set(results) == {"html2text"}
+    assert results["html2text"]["docs_per_sec"] > 0
+    assert results["html2text"]["mb_per_sec"] > 0
+
+
+# ---------------------------------------------------------------------------
+# Direct HTML output
+# ---------------------------------------------------------------------------
+
+
+CDN_IMAGE = (
+    "https://substackcdn.com/image/fetch/w_1456,c_limit,f_auto/"
+    "https%3A%2F%2Fbucket.s3.amazonaws.com%2Fchart.png"
+)
+
+IMAGE_POST_HTML = f"""
+<h1 class="post-title">Charts</h1>
+<div class="available-content">
+<p>Before</p>
+<figure><a class="image-link image2" href="{CDN_IMAGE}">
+<picture><source type="image/webp" srcset="{CDN_IMAGE} 1456w">
+<img src="{CDN_IMAGE}" srcset="{CDN_IMAGE} 1456w" data-attrs="{{}}" alt="A chart"></picture>
+<div class="image-link-expand"><button>Expand</button></div></a></figure>
+<p>After</p>
+</div>
+"""
+
+
+def test_extractor_renders_html_from_cleaned_source(tmp_path, html_parser):
+    post = ss.PostExtractor(debug_dir=str(tmp_path))(IMAGE_POST_HTML, "https://example.substack.com/p/charts")
+
+    assert post.html_content.startswith("<h1>Charts</h1>\n")
+    assert "<strong>Likes:</strong> 0" in post.html_content
+    assert f'<img alt="A chart" src="{CDN_IMAGE}"/>' in post.html_content
+    for removed in ("<a ", "<source", "srcset", "data-attrs", "<button"):
+        assert removed not in post.html_content
+    # The Markdown comes from the same cleaned tree, so the image is no longer wrapped in a link.
+    assert f"![A chart]({CDN_IMAGE})" in post.md_content
+    assert "[![" not in post.md_content
+
+
+def test_clean_post_content_keeps_image_inside_picture(html_parser):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(
+        f'<div><picture><source type="image/webp" srcset="{CDN_IMAGE} 1456w">'
+        f'<img src="{CDN_IMAGE}" sizes="100vw" alt="A chart"></picture><script>x()</script></div>',
+        html_parser,
+    )
+
+    content = ss.clean_post_content(soup.div)
+
+    assert content.find("source") is None and content.find("picture") is None
+    assert content.find("script") is None
+    assert str(content.find("img")) == f'<img alt="A chart" src="{CDN_IMAGE}"/>'
+
+
+@patch("substack_scraper.download_image")
+def test_process_html_images_points_at_local_copies(mock_download, tmp_path, monkeypatch):
+    monkeypatch.setattr(ss, "BASE_IMAGE_DIR", str(tmp_path / "images"))
+
+    html = ss.process_html_images(
+        f'<img alt="A chart" src="{CDN_IMAGE}"/>', "author", "post", str(tmp_path / "html" / "author")
+    )
+
+    assert html == '<img alt="A chart" src="../../images/author/post/chart.png"/>'
+    mock_download.assert_called_once_with(
+        "https://bucket.s3.amazonaws.com/chart.png", tmp_path / "images" / "author" / "post" / "chart.png",
+        None, None, ss.WRITE_BUFFER_SIZE,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Image download queue
+# ---------------------------------------------------------------------------
+
+
+def test_image_queue_rewrites_immediately_and_downloads_each_image_once(tmp_path, monkeypatch):
+    import threading
+
+    monkeypatch.setattr(ss, "BASE_IMAGE_DIR", str(tmp_path / "images"))
+    release = threading.Event()
+    downloads = []
+
+    def slow_download(url, save_path, pbar=None, session=None, buffer_size=ss.WRITE_BUFFER_SIZE):
+        release.wait(5)
+        downloads.append(url)
+        return str(save_path)
+
+    monkeypatch.setattr(ss, "download_image", slow_download)
+    md = f"![a]({CDN_IMAGE})\n\n![b]({CDN_IMAGE})"
+
+    with ss.ImageDownloadQueue(workers=2) as image_queue:
+        first = ss.process_markdown_images(md, "author", "post", queue=image_queue)
+        second = ss.process_markdown_images(md, "author", "post", queue=image_queue)
+        # Rewriting didn't wait for the (still blocked) download.
+        assert downloads == []
+        release.set()
+
+    assert first == second
+    assert "substackcdn.com" not in first
+    assert downloads == ["https://bucket.s3.amazonaws.com/chart.png"]
+    assert (image_queue.downloaded, image_queue.failed) == (1, 0)
+
+
+def test_image_store_dedups_by_url_and_content(stand_in, tmp_path):
+    stand_in.add("/logo.png", b"\x89PNG logo", "image/png")
+    stand_in.add("/logo-copy.png", b"\x89PNG logo", "image/png")
+    store_root = tmp_path / "images" / "_store"
+    session = fast_session()
+
+    with ss.ImageDownloadQueue(workers=2, session=session, store=ss.ImageStore(store_root)) as image_queue:
+        for slug in ("post-1", "post-2"):
+            image_queue.submit(f"{stand_in.url}logo.png", tmp_path / "images" / "a" / slug / "logo.png")
+        image_queue.submit(f"{stand_in.url}logo-copy.png", tmp_path / "images" / "b" / "post" / "logo.png")
+
+    assert stand_in.requests.count("/logo.png") == 1
+    assert image_queue.store.fetched == 2
+    blobs = [p for p in store_root.glob("*/*") if p.parent.name != "tmp"]
+    assert len(blobs) == 1
+    assert (tmp_path / "images" / "b" / "post" / "logo.png").read_bytes() == b"\x89PNG logo"
+
+    # A later run links the known URL from the persisted index without fetching it.
+    with ss.ImageDownloadQueue(session=session, store=ss.ImageStore(store_root)) as image_queue:
+        image_queue.submit(f"{stand_in.url}logo.png", tmp_path / "images" / "c" / "post" / "logo.png")
+
+    assert stand_in.requests.count("/logo.png") == 1
+    assert os.path.samefile(tmp_path / "images" / "c" / "post" / "logo.png", blobs[0])
+
+
+def test_image_downloads_use_the_queue_buffer_size(stand_in, tmp_path, monkeypatch):
+    stand_in.add("/logo.png", b"\x89PNG logo", "image/png")
+    download_image = ss.download_image
+    buffer_sizes = []
+
+    def recording_download(url, save_path, pbar=None, session=None, buffer_size=ss.WRITE_BUFFER_SIZE):
+        buffer_sizes.append(buffer_size)
+        return download_image(url, save_path, pbar, session, buffer_size)
+
+    monkeypatch.setattr(ss, "download_image", recording_download)
+    store = ss.ImageStore(tmp_path / "store", buffer_size=4096)
+    with ss.ImageDownloadQueue(session=fast_session(), buffer_size=4096) as image_queue:
+        image_queue.submit(f"{stand_in.url}logo.png", tmp_path / "plain" / "logo.png")
+    with ss.ImageDownloadQueue(session=fast_session(), store=store, buffer_size=4096) as image_queue:
+        image_queue.submit(f"{stand_in.url}logo.png", tmp_path / "stored" / "logo.png")
+
+    assert buffer_sizes == [4096, 4096]
+    assert (tmp_path / "stored" / "logo.png").read_bytes() == b"\x89PNG logo"
+    assert ss.WRITE_BUFFER_SIZE == 256 * 1024
+
+
+# ---------------------------------------------------------------------------
+# Image naming without HEAD requests
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("head, content_type, expected", [
+    (b"\x89PNG\r\n\x1a\nrest", "", ".png"),
+    (b"\xff\xd8\xff\xe0", "application/octet-stream", ".jpg"),
+    (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "", ".webp"),
+    (b"unknown", "image/gif", ".gif"),
+    (b"unknown", "text/html", None),
+])
+def test_sniff_image_extension(head, content_type, expected):
+    assert ss.sniff_image_extension(head, content_type) == expected
+
+
+def test_long_image_names_use_url_hints_without_requests(monkeypatch):
+    monkeypatch.setattr(ss.requests, "head", Mock(side_effect=AssertionError("no HEAD requests")))
+    long_name = "x" * 120
+    cdn_url = f"https://substackcdn.com/image/fetch/w_1456,f_png/https%3A%2F%2Fexample.com%2F{long_name}"
+
+    assert ss.sanitize_image_filename(cdn_url).endswith(".png")
+    assert ss.sanitize_image_filename(f"https://example.com/{long_name}.gif").endswith(".gif")
+
+
+def test_unknown_image_type_is_named_from_its_single_download(stand_in, tmp_path, monkeypatch):
+    monkeypatch.setattr(ss, "BASE_IMAGE_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(ss, "IMAGE_EXTENSION_CACHE", {})
+    stand_in.add("/img/", b"\x89PNG\r\n\x1a\n data", "application/octet-stream")
+
+    save_path = ss.localize_image(f"{stand_in.url}img/", "author", "post", session=fast_session())
+
+    assert save_path.suffix == ".png"
+    assert save_path.read_bytes() == b"\x89PNG\r\n\x1a\n data"
+    assert stand_in.requests == ["/img/"]
+    assert list(save_path.parent.iterdir()) == [save_path]
+
+
+def test_unknown_image_type_saved_by_earlier_run_is_not_fetched_again(stand_in, tmp_path, monkeypatch):
+    monkeypatch.setattr(ss, "BASE_IMAGE_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(ss, "IMAGE_EXTENSION_CACHE", {})
+    stand_in.add("/img/", b"\x89PNG\r\n\x1a\n data", "application/octet-stream")
+    first = ss.localize_image(f"{stand_in.url}img/", "author", "post", session=fast_session())
+
+    # A new run starts with an empty in-memory extension cache.
+    monkeypatch.setattr(ss, "IMAGE_EXTENSION_CACHE", {})
+    stand_in.requests.clear()
+    again = ss.localize_image(f"{stand_in.url}img/", "author", "post", session=fast_session())
+
+    assert again == first
+    assert stand_in.requests == []
+    assert list(first.parent.iterdir()) == [first]
+
+
+# ---------------------------------------------------------------------------
+# CDN image variants
+# ---------------------------------------------------------------------------
+
+
+def test_image_policy_builds_cdn_variant_url():
+    policy = ss.ImagePolicy(max_width=800, format="webp", quality=70)
+
+    assert policy.variant_url("https://bucket.s3.amazonaws.com/chart.png") == (
+        "https://substackcdn.com/image/fetch/w_800,c_limit,f_webp,q_70/"
+        "https%3A%2F%2Fbucket.s3.amazonaws.com%2Fchart.png"
+    )
+    assert ss.ImagePolicy().variant_url("https://bucket.s3.amazonaws.com/chart.png") is None
+    assert ss.sanitize_image_filename(CDN_IMAGE, policy) == "chart.webp"
+    assert ss.sanitize_image_filename(CDN_IMAGE, ss.ImagePolicy(max_width=800)) == "chart.png"
+
+
+def test_fetch_image_prefers_variant_and_falls_back_to_original(stand_in, tmp_path, monkeypatch):
+    monkeypatch.setattr(ss, "SUBSTACK_IMAGE_CDN", f"{stand_in.url}image/fetch/")
+    original = f"{stand_in.url}big.png"
+    stand_in.add("/big.png", b"\x89PNG\r\n\x1a\n full size", "image/png")
+    policy = ss.ImagePolicy(max_width=400, format="webp")
+    session = fast_session()
+
+    assert ss.fetch_image(original, tmp_path / "fallback.webp", session=session, policy=policy)
+    assert (tmp_path / "fallback.webp").read_bytes().endswith(b"full size")
+
+    stand_in.add(urlparse(policy.variant_url(original)).path, b"RIFF\x00\x00\x00\x00WEBP small", "image/webp")
+    assert ss.fetch_image(original, tmp_path / "variant.webp", session=session, policy=policy)
+    assert (tmp_path / "variant.webp").read_bytes().endswith(b"small")
+    assert stand_in.requests.count("/big.png") == 1
+
+
+def test_image_store_does_not_index_fallback_under_variant_url(stand_in, tmp_path, monkeypatch):
+    monkeypatch.setattr(ss, "SUBSTACK_IMAGE_CDN", f"{stand_in.url}image/fetch/")
+    original = f"{stand_in.url}big.png"
+    stand_in.add("/big.png", b"\x89PNG\r\n\x1a\n full size", "image/png")
+    policy = ss.ImagePolicy(max_width=400, format="webp")
+    store = ss.ImageStore(tmp_path / "store")
+
+    # The variant URL isn't served (404), so the store falls back to the original.
+    blob = store.fetch(original, fast_session(), policy)
+
+    assert blob.read_bytes().endswith(b"full size")
+    assert store.index == {original: blob.name}
+    assert store.lookup(original) == blob
+    assert store.lookup(original, policy) is None
+
+
+# ---------------------------------------------------------------------------
+# Local image transcoding
+# ---------------------------------------------------------------------------
+
+
+def _png_bytes(width, height):
+    from io import BytesIO
+
+    Image = pytest.importorskip("PIL.Image")
+
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_transcode_image_is_keyed_by_content(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+
+    source = tmp_path / "a.png"
+    source.write_bytes(_png_bytes(2000, 1000))
+    settings = ss.ImageTranscode(max_width=800, thumbnail_width=100)
+
+    optimized, thumbnail = ss.transcode_image(str(source), str(tmp_path / "derived"), settings)
+
+    with Image.open(optimized) as image:
+        assert (image.format, image.size) == ("WEBP", (800, 400))
+    with Image.open(thumbnail) as image:
+        assert image.size == (100, 50)
+    copy_of_source = tmp_path / "b.png"
+    copy_of_source.write_bytes(source.read_bytes())
+    mtime = os.stat(optimized).st_mtime_ns
+    assert ss.transcode_image(str(copy_of_source), str(tmp_path / "derived"), settings) == (optimized, thumbnail)
+    assert os.stat(optimized).st_mtime_ns == mtime
+
+
+def test_image_queue_links_optimized_copies(stand_in, tmp_path):
+    pytest.importorskip("PIL")
+    stand_in.add("/photo.png", _png_bytes(1200, 600), "image/png")
+    transcoder = ss.ImageTranscoder(ss.ImageTranscode(max_width=600), processes=1, derived_dir=tmp_path / "derived")
+    post_dir = tmp_path / "images" / "author" / "post"
+
+    with ss.ImageDownloadQueue(
+        session=fast_session(), store=ss.ImageStore(tmp_path / "store"), transcoder=transcoder
+    ) as image_queue:
+        image_queue.submit(f"{stand_in.url}photo.png", post_dir / "photo.png")
+
+    assert image_queue.output_path(post_dir / "photo.png") == post_dir / "photo-600w.webp"
+    assert image_queue.output_path(post_dir / "anim.gif") == post_dir / "anim.gif"
+    assert (post_dir / "photo-600w.webp").read_bytes()[8:12] == b"WEBP"
+    assert (post_dir / "photo-thumb.webp").exists()
+    assert (post_dir / "photo.png").exists()
+
+
+# ---------------------------------------------------------------------------
+# Atomic writes, resumable downloads and verification
+# ---------------------------------------------------------------------------
+
+
+def test_atomic_open_keeps_previous_file_when_interrupted(tmp_path):
+    path = tmp_path / "post.md"
+    path.write_text("complete", encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        with ss.atomic_open(path, 'w', encoding='utf-8') as file:
+            file.write("half")
+            raise RuntimeError("interrupted")
+
+    assert path.read_text(encoding="utf-8") == "complete"
+    assert os.listdir(tmp_path) == ["post.md"]
+
+
+def test_download_image_resumes_partial_file(stand_in, tmp_path):
+    body = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 10
+    stand_in.add("/big.png", body, "image/png")
+    save_path = tmp_path / "big.png"
+    ss.partial_path(save_path).write_bytes(body[:1000])
+
+    assert ss.download_image(f"{stand_in.url}big.png", save_path, session=fast_session()) == str(save_path)
+
+    assert stand_in.ranges == [1000]
+    assert save_path.read_bytes() == body
+    assert not ss.partial_path(save_path).exists()
+
+
+@pytest.mark.parametrize("part_size, requests", [(2568, 1), (2600, 2)])
+def test_download_image_keeps_part_past_the_end_only_if_complete(stand_in, tmp_path, part_size, requests):
+    body = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 10
+    stand_in.add("/big.png", body, "image/png")
+    save_path = tmp_path / "big.png"
+    ss.partial_path(save_path).write_bytes((body + b"stale tail")[:part_size])
+
+    assert ss.download_image(f"{stand_in.url}big.png", save_path, session=fast_session()) == str(save_path)
+
+    # A part of the image's exact size is complete; a longer one is from another image and is refetched.
+    assert len(stand_in.requests) == requests
+    assert save_path.read_bytes() == body
+    assert not ss.partial_path(save_path).exists()
+
+
+def test_download_image_restarts_when_server_sends_another_range(stand_in, tmp_path):
+    body = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 10
+    stand_in.add("/big.png", body, "image/png")
+    stand_in.range_starts["/big.png"] = 500
+    save_path = tmp_path / "big.png"
+    ss.partial_path(save_path).write_bytes(body[:1000])
+
+    assert ss.download_image(f"{stand_in.url}big.png", save_path, session=fast_session()) == str(save_path)
+
+    assert stand_in.ranges == [1000]
+    assert len(stand_in.requests) == 2
+    assert save_path.read_bytes() == body
+
+
+def test_verify_outputs_refetches_truncated_artifacts(stand_in, tmp_path, output_dirs):
+    stand_in.add("/logo.png", b"\x89PNG full logo", "image/png")
+    session = fast_session()
+    store = ss.ImageStore.default()
+    post_image = Path(ss.BASE_IMAGE_DIR) / "127" / "post" / "logo.png"
+    store.materialize(f"{stand_in.url}logo.png", post_image, session)
+    store.save()
+    blob = store.lookup(f"{stand_in.url}logo.png")
+    # Simulate a crash mid-write in an older version that wrote blobs in place.
+    post_image.unlink()
+    blob.write_bytes(b"\x89PNG fu")
+    os.link(blob, post_image)
+
+    scraper = ss.SubstackScraper(
+        f"{stand_in.url}p/post", str(tmp_path / "md"), str(tmp_path / "html"), session=session
+    )
+    synced = {}
+    # (slug, Markdown as synced, Markdown on disk, HTML page on disk or None for a complete one)
+    for slug, synced_md, md, html in [
+        ("done", "# Done", "# Done", None),
+        ("cut-page", "# Cut page", "# Cut page", "<html><body><p>Cu"),
+        ("cut-text", "# Cut text", "# Cut te", None),
+    ]:
+        url = f"{stand_in.url}p/{slug}"
+        md_path, html_path = scraper.get_post_filepaths(url)
+        Path(md_path).write_text(md, encoding="utf-8")
+        if html is None:
+            scraper.save_to_html_file(html_path, f"<p>{md}</p>")
+        else:
+            Path(html_path).write_text(html, encoding="utf-8")
+        content_hash = hashlib.sha256(synced_md.encode("utf-8")).hexdigest()
+        scraper.manifest.record(url, None, content_hash, md_path, html_path)
+        synced[slug] = (url, md_path)
+
+    scraper.verify_outputs()
+
+    assert post_image.read_bytes() == b"\x89PNG full logo"
+    # Damaged posts are re-fetched and overwritten, never deleted.
+    assert scraper.refetch_urls == {synced["cut-page"][0], synced["cut-text"][0]}
+    assert set(scraper.manifest.entries) == {synced["done"][0]}
+    assert all(os.path.exists(md_path) for _, md_path in synced.values())
+    assert scraper.should_fetch(synced["cut-text"][0])
+    assert not scraper.should_fetch(synced["done"][0])
+
+
+def test_verify_outputs_keeps_posts_whose_html_was_never_written(stand_in, tmp_path):
+    scraper = ss.SubstackScraper(
+        f"{stand_in.url}p/post", str(tmp_path / "md"), str(tmp_path / "html"), session=fast_session()
+    )
+    url = f"{stand_in.url}p/post"
+    md_path, html_path = scraper.get_post_filepaths(url)
+    Path(md_path).write_text("# Post", encoding="utf-8")
+    scraper.manifest.record(url, None, hashlib.sha256(b"# Post").hexdigest(), md_path, html_path)
+    # A post saved before this run, with no sync record.
+    older_md = Path(scraper.md_save_dir) / "older.md"
+    older_md.write_text("# Older", encoding="utf-8")
+
+    scraper.verify_outputs()
+
+    assert Path(md_path).read_text(encoding="utf-8") == "# Post"
+    assert older_md.exists()
+    assert url in scraper.manifest.entries
+    assert scraper.refetch_urls == set()
+
+
+# ---------------------------------------------------------------------------
+# Post catalog
+# ---------------------------------------------------------------------------
+
+
+def _essay(slug, **fields):
+    essay = {
+        "url": f"https://example.substack.com/p/{slug}", "title": slug.title(), "subtitle": "",
+        "author": "Jane", "date": "2024-01-01", "cover_image": "", "like_count": "0",
+        "file_link": f"substack_md_files/example/{slug}.md", "html_link": f"substack_html_pages/example/{slug}.html",
+    }
+    essay.update(fields)
+    return essay
+
+
+def test_catalog_upserts_and_exports_json(tmp_path):
+    import json
+
+    with ss.PostCatalog(str(tmp_path / "catalog.sqlite3")) as catalog:
+        catalog.upsert("example", [_essay("a", like_count="5"), _essay("b", date="2024-03-01")])
+        catalog.upsert("example", [_essay("a", like_count="9", title="A (edited)")])
+        catalog.upsert("other", [_essay("c")])
+
+        assert [e["title"] for e in catalog.posts("example", order_by="date")] == ["B", "A (edited)"]
+        assert [e["like_count"] for e in catalog.posts("example", order_by="likes")] == ["9", "0"]
+        plan = catalog.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM posts WHERE publication = ? ORDER BY like_count", ("example",)
+        ).fetchall()
+        assert "posts_by_likes" in str([tuple(row) for row in plan])
+
+        catalog.export_json("example", str(tmp_path / "example.json"))
+
+    exported = json.loads((tmp_path / "example.json").read_text(encoding="utf-8"))
+    assert [e["title"] for e in exported] == ["A (edited)", "B"]
+    assert exported[0] == {k: v for k, v in _essay("a", like_count="9", title="A (edited)").items() if k != "url"}
+
+
+def test_catalog_imports_legacy_json_once(tmp_path):
+    import json
+
+    legacy = [_essay("a"), _essay("a", like_count="3"), _essay("b")]
+    for essay in legacy:
+        del essay["url"]
+    (tmp_path / "example.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    with ss.PostCatalog(str(tmp_path / "catalog.sqlite3")) as catalog:
+        assert catalog.import_legacy_json("example", str(tmp_path / "example.json")) == 2
+        assert catalog.import_legacy_json("example", str(tmp_path / "example.json")) == 0
+        catalog.upsert("example", [_essay("a", like_count="4")])
+
+        posts = catalog.posts("example")
+
+    assert [(e["title"], e["like_count"]) for e in posts] == [("B", "0"), ("A", "4")]
+
+
+def test_author_page_embeds_index_and_writes_compact_shards(output_dirs, monkeypatch):
+    import json
+
+    monkeypatch.setattr(ss, "ESSAY_SHARD_SIZE", 2)
+    essays = [
+        _essay("a", date="2024-02-01", like_count="3"),
+        _essay("b", date="", like_count="10"),
+        _essay("c", date="2024-05-01", like_count="1"),
+    ]
+    (output_dirs / "data").mkdir()
+    (output_dirs / "data" / "example.json").write_text(json.dumps(essays), encoding="utf-8")
+    stale = output_dirs / "html" / "example" / "_index" / "essays-0009.js"
+    stale.parent.mkdir(parents=True)
+    stale.write_text("", encoding="utf-8")
+
+    ss.generate_html_file("example")
+
+    page = (output_dirs / "html" / "example.html").read_text(encoding="utf-8")
+    index = json.loads(re.search(r'id="essaysIndex">(.*?)</script>', page).group(1))
+    assert index["count"] == 3
+    assert index["shards"] == ["example/_index/essays-0000.js", "example/_index/essays-0001.js"]
+    assert index["orderings"] == {"date": [2, 0, 1], "likes": [1, 0, 2]}
+    assert "Slug" not in page and not stale.exists()
+
+    shard = (output_dirs / "html" / index["shards"][1]).read_text(encoding="utf-8")
+    assert shard == 'substackEssayShard(1,%s);\n' % json.dumps([essays[2]], separators=(",", ":"))
+
+
+def test_author_page_without_index_placeholder_embeds_essays(output_dirs):
+    import json
+
+    template = Path(ss.HTML_TEMPLATE)
+    template.write_text(
+        '<script type="application/json" id="essaysData"></script>', encoding="utf-8"
+    )
+    (output_dirs / "data").mkdir()
+    (output_dirs / "data" / "example.json").write_text(json.dumps([_essay("a")]), encoding="utf-8")
+
+    ss.generate_html_file("example")
+
+    page = (output_dirs / "html" / "example.html").read_text(encoding="utf-8")
+    assert json.dumps([_essay("a")], separators=(",", ":")) in page
+    assert not (output_dirs / "html" / "example" / "_index").exists()
+
+
+# ---------------------------------------------------------------------------
+# Full-text search
+# ---------------------------------------------------------------------------
+
+
+def test_search_index_ranks_title_hits_first(tmp_path):
+    with ss.SearchIndex(str(tmp_path / "search.sqlite3")) as index:
+        index.add("u1", "example", "Notes", "", "Jane", "2024-01-01", "a.md", "Inflation rose again this month.")
+        index.add("u2", "example", "Inflation explained", "", "Jane", "2024-02-01", "b.md", "Prices and money.")
+        index.add("u3", "other", "Gardening", "", "Sam", "", "c.md", "Tomatoes need sun.")
+        index.add("u1", "example", "Notes", "", "Jane", "2024-01-01", "a.md", "Inflating balloons.")
+
+        hits = index.search("inflation")
+        assert [hit.url for hit in hits] == ["u2", "u1"]  # u1 matches through stemming
+        assert index.search("tomato", publication="example") == []
+        assert "[Tomatoes]" in index.search('tomatoes "')[0].snippet  # invalid syntax falls back to terms
+
+
+def test_scrape_without_fts5_skips_indexing(output_dirs, capsys, monkeypatch):
+    def no_fts5(cls):
+        raise ss.sqlite3.OperationalError("no such module: fts5")
+
+    monkeypatch.setattr(ss.SearchIndex, "open_default", classmethod(no_fts5))
+    scraper = make_page_scraper(output_dirs, num_posts=2, workers=1)
+    scraper.scrape_posts()
+
+    assert "Search index unavailable, not indexing posts: no such module: fts5" in capsys.readouterr().out
+    assert len(list((output_dirs / "md").rglob("*.md"))) == 2
+    with pytest.raises(ss.sqlite3.OperationalError):
+        ss.search_main(["search", "Post"])
+
+
+def test_scrape_indexes_posts_and_search_command_finds_them(output_dirs, capsys):
+    scraper = make_page_scraper(output_dirs, num_posts=3, workers=1)
+    scraper.scrape_posts()
+    capsys.readouterr()
+
+    ss.search_main(["search", "Body", "of", "Post", "2"])
+    output = capsys.readouterr().out
+    assert output.splitlines()[0] == "1. Post 2 (example, Date not found)"
+    assert "hits in" in output
+
+    ss.search_main(["reindex", "--directory", str(output_dirs / "md")])
+    assert "Indexed 3 posts" in capsys.readouterr().out
+    with ss.SearchIndex.open_default() as index:
+        assert index.search("post")[0].url.startswith("https://example.substack.com/p/post-")
+
+
+# ---------------------------------------------------------------------------
+# Premium browser
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("html, expected", [
+    ('<h2 class="paywall-title">Paid</h2>', True),
+    ('<div class="available-content"><p>Preview</p></div><div class="paywall">Subscribe</div>', True),
+    ('<div data-component-name="PaywallToDOM"><p>x</p></div>', True),
+    ('<div class="available-content"><p>Full post</p></div><div class="paywall-jump"></div>', False),
+])
+def test_is_truncated_html(html, expected):
+    assert ss.is_truncated_html(html) is expected
+
+
+class FakeElement:
+    def __init__(self, on_click=None):
+        self.on_click = on_click
+        self.keys = []
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        if self.on_click is not None:
+            self.on_click()
+
+    def send_keys(self, keys):
+        self.keys.append(keys)
+
+
+class FakeDriver:
+    """Stands in for a WebDriver, serving pages from ``pages`` by URL.
+
+    With ``crash_after``, page loads after that many fail as if the browser died.
+    ``redirects`` maps URLs to where loading them ends up. ``elements`` maps
+    locator values to the elements found; without it every lookup finds one.
+    """
+
+    def __init__(self, pages, cookies=(), crash_after=None, redirects=None, elements=None):
+        self.pages = pages
+        self.cookies = list(cookies)
+        self.crash_after = crash_after
+        self.redirects = redirects or {}
+        self.elements = elements
+        self.visited = []
+        self.page_source = ""
+
+    @property
+    def current_url(self):
+        if self.crash_after is not None and len(self.visited) > self.crash_after:
+            raise ss.WebDriverException("browser has gone away")
+        return self.visited[-1] if self.visited else "about:blank"
+
+    def get(self, url):
+        self.visited.append(self.redirects.get(url, url))
+        self.current_url
+        self.page_source = self.pages.get(url, "<html></html>")
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def find_elements(self, by, value):
+        if self.elements is None:
+            return [object()]
+        return list(self.elements.get(value, []))
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(value)
+        return found[0]
+
+    def get_cookies(self):
+        return self.cookies
+
+    def quit(self):
+        pass
+
+
+def make_premium_scraper(stand_in, tmp_path, monkeypatch, driver, *more_drivers, **kwargs):
+    drivers = iter((driver,) + more_drivers)
+    monkeypatch.setattr(ss.BrowserManager, "create_driver", staticmethod(lambda **_: next(drivers)))
+    kwargs.setdefault("skip_login", True)
+    return ss.PremiumSubstackScraper(
+        f"{stand_in.url}p/free", str(tmp_path / "md"), str(tmp_path / "html"),
+        session=fast_session(), cookie_jar=str(tmp_path / "cookies.txt"), **kwargs,
+    )
+
+
+def test_hybrid_premium_loads_only_truncated_posts_in_browser(stand_in, tmp_path, monkeypatch, capsys):
+    paid_preview = POST_HTML.format(title="Paid") + '<div class="paywall"><h2 class="paywall-title">x</h2></div>'
+    stand_in.add("/p/free", POST_HTML.format(title="Free"), "text/html")
+    stand_in.add("/p/paid", paid_preview, "text/html")
+    driver = FakeDriver({f"{stand_in.url}p/paid": POST_HTML.format(title="Paid in full")})
+    scraper = make_premium_scraper(stand_in, tmp_path, monkeypatch, driver, hybrid=True)
+    driver.visited.clear()
+
+    free = scraper.fetch_post(f"{stand_in.url}p/free")
+    paid = scraper.fetch_post(f"{stand_in.url}p/paid")
+
+    assert scraper.extract_post(free, "").title == "Free"
+    assert scraper.extract_post(paid, "").title == "Paid in full"
+    assert driver.visited == [f"{stand_in.url}p/paid"]
+    assert scraper.fetch_paths == {"http": 1, "browser": 1}
+
+
+def test_hybrid_premium_exports_cookies_of_the_browser_that_loaded_the_post(stand_in, tmp_path, monkeypatch):
+    login = {"name": "substack.sid", "value": "s3cret", "domain": "127.0.0.1", "path": "/"}
+    fresh = {"name": "connect.sid", "value": "fresh", "domain": "127.0.0.1", "path": "/"}
+    paid_preview = POST_HTML.format(title="Paid") + '<div class="paywall"><h2 class="paywall-title">x</h2></div>'
+    stand_in.add("/p/paid", paid_preview, "text/html")
+    pages = {f"{stand_in.url}p/paid": POST_HTML.format(title="Paid in full")}
+    first, second = FakeDriver(pages, [login]), FakeDriver(pages, [fresh])
+    scraper = make_premium_scraper(stand_in, tmp_path, monkeypatch, first, second, hybrid=True, browsers=2)
+    # Start the second browser and queue it ahead of the first.
+    with scraper.drivers.acquire():
+        with scraper.drivers.acquire():
+            pass
+    first.visited.clear()
+
+    scraper.fetch_post(f"{stand_in.url}p/paid")
+
+    assert first.visited == []
+    assert scraper.session.cookies.get("connect.sid") == "fresh"
+
+
+LOGIN_OPTION = "//a[@class='login-option substack-login__login-option']"
+LOGIN_SUBMIT = '//*[@id="substack-login"]/div[2]/div[2]/form/button'
+
+
+def test_premium_login_finishes_when_session_cookie_appears(stand_in, tmp_path, monkeypatch):
+    import time
+
+    elements = {"error-container": []}
+    driver = FakeDriver({}, elements=elements)
+    email, password = FakeElement(), FakeElement()
+    session_cookie = {"name": "substack.sid", "value": "new", "domain": ".substack.com", "path": "/"}
+    elements[LOGIN_OPTION] = [FakeElement(on_click=lambda: elements.update(email=[email], password=[password]))]
+    elements[LOGIN_SUBMIT] = [FakeElement(on_click=lambda: driver.cookies.append(session_cookie))]
+
+    started = time.monotonic()
+    scraper = make_premium_scraper(stand_in, tmp_path, monkeypatch, driver, skip_login=False)
+
+    assert time.monotonic() - started < 5
+    assert driver.visited[0] == ss.SIGN_IN_URL
+    assert email.keys == [ss.EMAIL] and password.keys == [ss.PASSWORD]
+    assert scraper.session.cookies.get("substack.sid") == "new"
+
+
+def test_premium_login_that_times_out_on_sign_in_page_fails(stand_in, tmp_path, monkeypatch):
+    # Substack never answers the submitted form.
+    elements = {"error-container": [], "email": [FakeElement()], "password": [FakeElement()]}
+    driver = FakeDriver({}, elements=elements)
+    elements[LOGIN_OPTION] = [FakeElement()]
+    elements[LOGIN_SUBMIT] = [FakeElement()]
+    monkeypatch.setattr(ss, "LOGIN_TIMEOUT", 0.5)
+
+    with pytest.raises(Exception, match="Login unsuccessful"):
+        make_premium_scraper(stand_in, tmp_path, monkeypatch, driver, skip_login=False)
+
+    assert not (tmp_path / "cookies.txt").exists()
+
+
+@pytest.mark.parametrize("signed_in", [True, False])
+def test_premium_reuses_saved_session_while_substack_accepts_it(stand_in, tmp_path, monkeypatch, signed_in):
+    import time
+
+    jar = ss.load_cookie_jar(str(tmp_path / "cookies.txt"))
+    jar.set_cookie(ss.cookie_from_driver({
+        "name": "substack.sid", "value": "saved", "domain": ".substack.com", "path": "/",
+        "expiry": int(time.time()) + 3600,
+    }))
+    ss.save_cookie_jar(jar)
+    if signed_in:
+        driver = FakeDriver({}, redirects={ss.SIGN_IN_URL: "https://substack.com/home"}, elements={})
+    else:
+        driver = FakeDriver({}, elements={LOGIN_OPTION: [FakeElement()]})
+    logins = []
+    monkeypatch.setattr(ss.PremiumSubstackScraper, "login", lambda self: logins.append(self))
+
+    make_premium_scraper(stand_in, tmp_path, monkeypatch, driver, skip_login=False)
+
+    assert driver.cookies[0]["value"] == "saved"
+    assert driver.visited[:2] == ["https://substack.com/", "https://substack.com/home" if signed_in else ss.SIGN_IN_URL]
+    assert len(logins) == (0 if signed_in else 1)
+
+
+def test_premium_driver_pool_replaces_crashed_browser(stand_in, tmp_path, monkeypatch):
+    login = {"name": "substack.sid", "value": "s3cret", "domain": "127.0.0.1", "path": "/"}
+    url = f"{stand_in.url}p/paid"
+    pages = {url: POST_HTML.format(title="Paid")}
+    first = FakeDriver(pages, [login], crash_after=1)
+    replacement = FakeDriver(pages)
+    scraper = make_premium_scraper(stand_in, tmp_path, monkeypatch, first, replacement, browsers=2)
+
+    html = scraper.fetch_post(url)
+
+    assert scraper.extract_post(html, url).title == "Paid"
+    assert scraper.workers == 2
+    assert scraper.drivers.restarts == 1
+    assert scraper.drivers.drivers == [replacement]
+    assert replacement.visited == [f"{stand_in.url}p/free", url]
+    assert login in replacement.cookies
+
+
+def test_lean_mode_loads_eagerly_and_blocks_heavy_requests(monkeypatch):
+    options = ss.ChromeOptions()
+    ss.BrowserManager.apply_lean_options(options)
+    capabilities = options.to_capabilities()
+    assert capabilities["pageLoadStrategy"] == "eager"
+    assert capabilities["goog:chromeOptions"]["prefs"]["profile.managed_default_content_settings.images"] == 2
+
+    commands = []
+    driver = FakeDriver({})
+    driver.execute_cdp_cmd = lambda cmd, params: commands.append((cmd, params))
+    launched = []
+    monkeypatch.setattr(ss.BrowserManager, "launch_driver", classmethod(
+        lambda cls, *args: launched.append(args) or driver
+    ))
+
+    assert ss.BrowserManager.create_driver(lean=True) is driver
+    assert launched[0][-1] is True
+    assert commands[0] == ("Network.enable", {})
+    blocked = commands[1][1]["urls"]
+    assert "*.woff2" in blocked and "*google-analytics.com*" in blocked
+
+
+def test_driver_pool_caps_instances_and_hands_back_idle_ones():
+    import threading
+
+    started = []
+
+    def factory():
+        started.append(FakeDriver({}))
+        return started[-1]
+
+    pool = ss.DriverPool(factory, 2, "https://example.substack.com/", lambda: [])
+    barrier = threading.Barrier(2)
+
+    def load():
+        with pool.acquire() as driver:
+            barrier.wait(timeout=5)
+            driver.get("https://example.substack.com/p/x")
+
+    threads = [threading.Thread(target=load) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with pool.acquire() as driver:
+        assert driver in started
+
+    assert len(started) == 2
+    pool.close()
+    assert pool.drivers == []
+
+
+def test_premium_login_cookies_reach_http_session_and_jar(stand_in, tmp_path, monkeypatch):
+    import time
+
+    login = {"name": "substack.sid", "value": "s3cret", "domain": "127.0.0.1", "path": "/",
+             "secure": False, "httpOnly": True, "expiry": int(time.time()) + 3600}
+    expired = {"name": "old", "value": "x", "domain": "127.0.0.1", "path": "/", "expiry": 1}
+    scraper = make_premium_scraper(stand_in, tmp_path, monkeypatch, FakeDriver({}, [login, expired]))
+
+    assert scraper.session.cookies.get("substack.sid") == "s3cret"
+    assert scraper.session.cookies.get("old") is None
+    assert oct((tmp_path / "cookies.txt").stat().st_mode & 0o777) == "0o600"
+    jar = ss.load_cookie_jar(str(tmp_path / "cookies.txt"))
+    assert [cookie.name for cookie in jar] == ["substack.sid"]
+    assert ss.has_login_cookie(jar)
+
+    # A later run starts with the saved session even before the browser is consulted.
+    later = make_premium_scraper(stand_in, tmp_path, monkeypatch, FakeDriver({}))
+    assert later.session.cookies.get("substack.sid") == "s3cret"
+
+
+def test_cookie_export_rewrites_jar_only_when_cookies_change(stand_in, tmp_path, monkeypatch):
+    import threading
+
+    login = {"name": "substack.sid", "value": "s3cret", "domain": "127.0.0.1", "path": "/"}
+    driver = FakeDriver({}, [login])
+    scraper = make_premium_scraper(stand_in, tmp_path, monkeypatch, driver)
+    saves = []
+    save_cookie_jar = ss.save_cookie_jar
+    monkeypatch.setattr(ss, "save_cookie_jar", lambda jar: (saves.append(jar), save_cookie_jar(jar)))
+
+    # Fetch threads re-export after browser loads; an unchanged cookie set isn't saved again.
+    exported = []
+    threads = [
+        threading.Thread(target=lambda: exported.append(scraper.export_session_cookies(driver)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert exported == [0, 0, 0, 0]
+    assert saves == []
+
+    driver.cookies = [dict(login, value="r0tated")]
+    assert scraper.export_session_cookies(driver) == 1
+    assert len(saves) == 1
+    assert scraper.session.cookies.get("substack.sid") == "r0tated"
+    assert oct((tmp_path / "cookies.txt").stat().st_mode & 0o777) == "0o600"
+    assert not list(tmp_path.glob("cookies.txt.*"))
+    assert [cookie.value for cookie in ss.load_cookie_jar(str(tmp_path / "cookies.txt"))] == ["r0tated"]